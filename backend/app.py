@@ -27,6 +27,7 @@ if __name__ == '__main__':
     print("=" * 60)
     print("\n📡 API Endpoints:")
     print("   - POST /api/v1/analyze-resume     - Analyze resume")
+    print("   - POST /api/v1/analyze-batch      - Analyze several resumes")
     print("   - GET  /api/v1/templates          - List templates")
     print("   - POST /api/v1/latex/validate     - Validate LaTeX")
     print("   - POST /api/v1/latex/compile      - Compile to PDF")
@@ -2,7 +2,9 @@
 Gunicorn configuration for ResuMatch AI Backend
 Optimized for DigitalOcean App Platform
 """
+import gc
 import os
+import resource
 import multiprocessing
 
 # Server socket
@@ -11,14 +13,20 @@ backlog = 2048
 
 # Worker processes
 workers = int(os.environ.get('GUNICORN_WORKERS', 2))
-worker_class = 'sync'
+# Threaded workers: requests spend most of their time waiting on Gemini,
+# so each worker keeps serving other requests while one is blocked on I/O
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
 worker_connections = 1000
 timeout = 120
 keepalive = 5
 
-# Restart workers after processing this many requests (helps prevent memory leaks)
-max_requests = 1000
-max_requests_jitter = 50
+# Restart workers after processing this many requests. Off by default: a
+# restart re-dirties the copy-on-write pages shared with the preloaded master
+# and cold-starts the Gemini channel. Set GUNICORN_MAX_REQUESTS if worker
+# memory (logged as peak RSS on exit) keeps growing.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 50))
 
 # Logging
 accesslog = '-'
@@ -41,7 +49,8 @@ tmp_upload_dir = None
 keyfile = None
 certfile = None
 
-# Preload app for faster worker spawning
+# Preload app for faster worker spawning; Flask, google-generativeai and
+# PyMuPDF are imported once in the master and shared copy-on-write by workers
 preload_app = True
 
 # Graceful timeout for worker restart
@@ -53,9 +62,49 @@ def on_starting(server):
     print("🚀 Starting ResuMatch AI Backend with Gunicorn")
     print("=" * 60)
 
+    # Build the shared AI services (SDK config, models, response cache) once in
+    # the master so every worker inherits them; this makes no network calls, and
+    # the gRPC channel itself is still opened per worker after fork
+    if preload_app:
+        try:
+            from src.services.ai_service import get_analyzer
+            from src.services.ai_latex_service import get_ai_latex_service
+            get_analyzer()
+            get_ai_latex_service()
+        except Exception as e:
+            print(f"⚠️  Gemini services not preloaded: {e}")
+
+def pre_fork(server, worker):
+    """Called just before a worker is forked."""
+    # Move preloaded objects out of the GC's tracked generations so collections
+    # in the worker don't write to (and un-share) the parent's memory pages
+    gc.freeze()
+
+def post_fork(server, worker):
+    """Called just after a worker has been forked."""
+    # Connect to Gemini in the background so the first request doesn't pay
+    # for the channel setup; done after fork since gRPC channels can't be shared
+    from src.config.settings import get_config
+    config = get_config()
+    if config.GEMINI_WARMUP_ENABLED:
+        from src.services.ai_service import start_warmup
+        start_warmup(config.GEMINI_KEEPALIVE_SECONDS)
+
+def worker_int(worker):
+    """Called when a worker receives SIGINT or SIGQUIT."""
+    # Don't hold the worker open while request threads sleep between Gemini retries
+    from src.services.ai_service import stop_retries
+    stop_retries()
+
+def worker_exit(server, worker):
+    """Called just after a worker has exited, in the worker process."""
+    # ru_maxrss is in kilobytes on Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"👋 Worker {worker.pid} exiting - peak RSS {peak_mb:.0f} MB")
+
 def when_ready(server):
     """Called just after the server is started."""
-    print(f"✅ Server ready - Workers: {workers}, Port: {bind}")
+    print(f"✅ Server ready - Workers: {workers}, Threads: {threads}, Port: {bind}")
 
 def on_reload(server):
     """Called when a worker is reloaded."""
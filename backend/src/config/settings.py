@@ -2,6 +2,7 @@
 Configuration settings for ResuMatch AI Backend
 """
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -16,9 +17,12 @@ class Config:
     # Flask Configuration
     FLASK_ENV = os.getenv('FLASK_ENV', 'production')
     FLASK_DEBUG = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
     
     # File Upload Configuration
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
+    # Uploads up to this size are buffered in memory instead of spilling to a temp file
+    UPLOAD_MEMORY_LIMIT = int(os.getenv('UPLOAD_MEMORY_LIMIT', str(4 * 1024 * 1024)))
     ALLOWED_EXTENSIONS = {'pdf'}
     
     # CORS Configuration
@@ -29,20 +33,84 @@ class Config:
         'http://localhost:3001',
         'http://127.0.0.1:3000'
     ]
+    # Browsers may reuse a preflight result for this many seconds; read by
+    # Flask-CORS from app.config, so it also covers @cross_origin() routes
+    CORS_MAX_AGE = 86400
     
     # Gemini API Configuration
+    GEMINI_MODEL = 'models/gemini-2.5-flash'
     GENERATION_CONFIG = {
         "temperature": 0.3,
         "top_p": 0.8,
         "top_k": 40,
-        "max_output_tokens": 8192,
+        # The analysis JSON is well under 2k tokens; the headroom covers
+        # gemini-2.5 thinking tokens, which count against this budget
+        "max_output_tokens": 4096,
+        # JSON mode: no markdown fences or preamble to generate and strip
+        "response_mime_type": "application/json",
     }
     
+    # Smaller model for the LaTeX assistant's short-output tasks (bullet points,
+    # skill suggestions, single-section rewrites)
+    GEMINI_LIGHT_MODEL = os.getenv('GEMINI_LIGHT_MODEL', 'models/gemini-2.5-flash-lite')
+    
+    # LaTeX assistant: several of its prompts return plain text or LaTeX, so no JSON mode.
+    # Its prompts ask for bounded output (a few suggestions, at most two rewritten
+    # sections); the cap leaves the same thinking-token headroom as the analysis
+    LATEX_GENERATION_CONFIG = {
+        "temperature": 0.3,
+        "top_p": 0.8,
+        "max_output_tokens": 4096,
+    }
+    
+    # Maximum concurrent Gemini calls per worker process (streams hold a slot
+    # only while the model is generating, however slowly their clients read)
+    GEMINI_MAX_CONCURRENT_CALLS = int(os.getenv('GEMINI_MAX_CONCURRENT_CALLS', '20'))
+    
+    # Open the Gemini channel in each worker right after fork, and optionally
+    # keep it warm with a free count_tokens call every N seconds (0 = off)
+    GEMINI_WARMUP_ENABLED = os.getenv('GEMINI_WARMUP_ENABLED', 'True').lower() == 'true'
+    GEMINI_KEEPALIVE_SECONDS = int(os.getenv('GEMINI_KEEPALIVE_SECONDS', '0'))
+    
     # Analysis Configuration
     MAX_RETRIES = 3
+    GEMINI_REQUEST_TIMEOUT = 30  # seconds for the first attempt; retries get 1/2, 1/3, ...
+    RETRY_BACKOFF_BASE = 1.0  # seconds
+    RETRY_BACKOFF_CAP = 8.0  # seconds
+    CIRCUIT_BREAKER_FAIL_THRESHOLD = 5
+    CIRCUIT_BREAKER_RESET_SECONDS = 30
     RESUME_TEXT_LIMIT = 4000
+    BATCH_MAX_FILES = int(os.getenv('BATCH_MAX_FILES', '10'))
     JOB_DESCRIPTION_LIMIT = 1500
     
+    # PDF extraction: documents with at least this many pages are split across
+    # a process pool; resumes are usually far shorter and stay in-process
+    PDF_EXTRACT_WORKERS = int(os.getenv('PDF_EXTRACT_WORKERS', str(min(os.cpu_count() or 1, 4))))
+    PDF_PARALLEL_MIN_PAGES = int(os.getenv('PDF_PARALLEL_MIN_PAGES', '8'))
+    PDF_TEXT_CACHE_SIZE = 128  # extracted texts kept in memory per worker
+    PDF_TEXT_CACHE_MEMORY_CHARS = 16 * 1024 * 1024  # total size cap for those texts
+    # Extracted texts are also stored in SQLite so every worker sees the others'
+    # extractions ('' uses a private per-user temp directory)
+    PDF_TEXT_CACHE_PATH = os.getenv('PDF_TEXT_CACHE_PATH', '')
+    PDF_TEXT_CACHE_TTL = 24 * 60 * 60  # 24 hours
+    
+    # Background analysis jobs (?async=1); the SQLite store lets any worker answer polls
+    JOB_STORE_PATH = os.getenv('JOB_STORE_PATH', '')
+    JOB_MAX_WORKERS = int(os.getenv('JOB_MAX_WORKERS', '8'))
+    # Queued plus running jobs per worker; further ?async=1 requests get a 503
+    JOB_MAX_PENDING = int(os.getenv('JOB_MAX_PENDING', '32'))
+    JOB_RETRY_AFTER = 10  # seconds suggested to clients turned away by a full queue
+    JOB_TTL = 60 * 60  # 1 hour
+    
+    # Response Cache Configuration
+    RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'True').lower() == 'true'
+    RESPONSE_CACHE_PATH = os.getenv('RESPONSE_CACHE_PATH', '')
+    RESPONSE_CACHE_TTL = 24 * 60 * 60  # 24 hours
+    # Hot entries kept in each worker's memory in front of SQLite
+    RESPONSE_CACHE_MEMORY_SIZE = int(os.getenv('RESPONSE_CACHE_MEMORY_SIZE', '512'))
+    # Total characters those entries may hold (0 for no limit)
+    RESPONSE_CACHE_MEMORY_CHARS = int(os.getenv('RESPONSE_CACHE_MEMORY_CHARS', str(8 * 1024 * 1024)))
+    
     @classmethod
     def validate_config(cls):
         """Validate required configuration"""
@@ -58,6 +126,8 @@ class DevelopmentConfig(Config):
 class ProductionConfig(Config):
     """Production configuration"""
     FLASK_DEBUG = False
+    # Per-request progress logs are INFO; keep them out of production by default
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'WARNING')
 
 # Configuration factory
 config = {
@@ -66,7 +136,8 @@ config = {
     'default': DevelopmentConfig
 }
 
+@lru_cache(maxsize=1)
 def get_config():
-    """Get configuration based on environment"""
+    """Get configuration based on environment (resolved once per process)"""
     env = os.getenv('FLASK_ENV', 'development')
     return config.get(env, config['default'])
\ No newline at end of file
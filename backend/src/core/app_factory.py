@@ -5,10 +5,13 @@ from flask import Flask, jsonify
 from flask_cors import CORS
 import logging
 from .exceptions import ResuMatchError
+from .json_provider import ORJSONProvider, ORJSON_AVAILABLE
+from .upload_request import UploadRequest
+from src.config.settings import get_config
 
 # Configure logging
 logging.basicConfig(
-    level=logging.INFO,
+    level=get_config().LOG_LEVEL,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
@@ -25,9 +28,16 @@ def create_app(config_name: str = 'development') -> Flask:
         Configured Flask application instance
     """
     app = Flask(__name__)
+    app.request_class = UploadRequest
+    # Match '/templates' and '/templates/' alike instead of redirecting; must
+    # be set before any rule is registered
+    app.url_map.strict_slashes = False
+    
+    # Serialize JSON responses with orjson when available
+    if ORJSON_AVAILABLE:
+        app.json = ORJSONProvider(app)
     
     # Load configuration
-    from src.config.settings import get_config
     config = get_config()
     app.config.from_object(config)
     
@@ -0,0 +1,35 @@
+"""
+JSON provider for ResuMatch AI
+Serializes responses with orjson when it is installed
+"""
+from typing import Any
+from flask.json.provider import DefaultJSONProvider
+
+# Try to import orjson, with fallback to Flask's stdlib-based provider
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson's native encoder and decoder"""
+    
+    OPTIONS = orjson.OPT_NON_STR_KEYS if ORJSON_AVAILABLE else 0
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return self._dump_bytes(obj).decode('utf-8')
+    
+    def loads(self, s, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+    
+    def response(self, *args: Any, **kwargs: Any):
+        # Hand orjson's bytes straight to the response instead of decoding to str
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._dump_bytes(obj), mimetype=self.mimetype)
+    
+    def _dump_bytes(self, obj: Any) -> bytes:
+        # Types orjson doesn't know (Decimal, UUID subclasses, ...) go through
+        # Flask's default conversion
+        return orjson.dumps(obj, default=DefaultJSONProvider.default, option=self.OPTIONS)
@@ -0,0 +1,44 @@
+"""
+Request class for ResuMatch AI
+Keeps typical resume uploads in memory rather than in a disk-backed temp file
+"""
+import hashlib
+from io import BytesIO
+from typing import IO, Optional
+from flask import Request, current_app
+
+
+class FingerprintedBytesIO(BytesIO):
+    """
+    In-memory upload buffer that hashes the file as Werkzeug writes it
+    
+    The multipart parser only appends, so the digest covers exactly the
+    uploaded bytes and matches hashing them afterwards, without a second pass.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self._hasher = hashlib.blake2b(digest_size=16)
+    
+    def write(self, data) -> int:
+        self._hasher.update(data)
+        return super().write(data)
+    
+    def fingerprint(self) -> str:
+        """BLAKE2b-128 hex digest of everything written so far"""
+        return self._hasher.hexdigest()
+
+
+class UploadRequest(Request):
+    """Flask request that buffers uploads below UPLOAD_MEMORY_LIMIT in memory"""
+    
+    def _get_file_stream(self, total_content_length: Optional[int], content_type: Optional[str],
+                         filename: Optional[str] = None,
+                         content_length: Optional[int] = None) -> IO[bytes]:
+        # Werkzeug spools anything past 500KB to disk, so multi-page PDFs were
+        # written out and read back before extraction; keep them in memory
+        # when the request size is known and within the limit
+        limit = current_app.config.get('UPLOAD_MEMORY_LIMIT', 0)
+        if total_content_length is not None and total_content_length <= limit:
+            return FingerprintedBytesIO()
+        return super()._get_file_stream(total_content_length, content_type, filename, content_length)
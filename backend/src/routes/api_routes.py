@@ -1,30 +1,67 @@
 """
 API routes for ResuMatch AI
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context, url_for
 from flask_cors import cross_origin
 from werkzeug.utils import secure_filename
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import json
 import logging
+from ..config.settings import get_config
+
+logger = logging.getLogger(__name__)
+config = get_config()
 
 # Create blueprint for API routes
 api_bp = Blueprint('api', __name__)
 
+# Live validation from the frontend re-sends the same file names; secure_filename
+# runs Unicode normalization and a regex pass, so remember recent results
+_secure_filename = lru_cache(maxsize=1024)(secure_filename)
+
 # Initialize services with error handling
+# The AI analyzer is built lazily on the first analysis request (see get_analyzer)
 try:
     from ..services.pdf_service import PDFProcessor
-    from ..services.ai_service import AIAnalyzer
+    from ..services.ai_service import get_analyzer
+    from ..services.job_queue import JobQueueFull, analysis_jobs
     from ..validators.file_validator import FileValidator
     pdf_processor = PDFProcessor()
-    ai_analyzer = AIAnalyzer()
-    print("Services initialized successfully")
+    logger.info("Services initialized successfully")
 except ImportError as e:
-    print(f"Import error: {e}")
+    logger.error(f"Import error: {e}")
     pdf_processor = None
-    ai_analyzer = None
+    get_analyzer = None
+    analysis_jobs = None
 except Exception as e:
-    print(f"Service initialization error: {e}")
+    logger.error(f"Service initialization error: {e}")
     pdf_processor = None
-    ai_analyzer = None
+    get_analyzer = None
+    analysis_jobs = None
+
+
+def _get_ai_analyzer():
+    """Return the shared AI analyzer, or None if it cannot be initialized"""
+    try:
+        return get_analyzer() if get_analyzer else None
+    except Exception as e:
+        logger.error(f"AI service initialization error: {e}")
+        return None
+
+
+def _analyze_pdf(ai_analyzer, file_name: str, pdf_bytes: bytes, job_description: str) -> dict:
+    """Extract and analyze one resume, returning a per-file result object"""
+    success, result = pdf_processor.extract_text_from_pdf(pdf_bytes)
+    if not success:
+        return {"file_name": file_name, "success": False,
+                "error": "Failed to process resume", "message": result}
+    
+    analysis_result = ai_analyzer.analyze_resume(result, job_description)
+    if isinstance(analysis_result, dict) and "error" in analysis_result:
+        return {"file_name": file_name, "success": False,
+                "error": "Analysis failed", "message": analysis_result["error"]}
+    return {"file_name": file_name, "success": True, "analysis": analysis_result}
 
 @api_bp.route('/')
 @cross_origin()
@@ -37,17 +74,16 @@ def health_check():
         "cors": "enabled"
     })
 
-@api_bp.route('/analyze-resume', methods=['POST', 'OPTIONS'])
+@api_bp.route('/analyze-resume', methods=['POST'])
 @cross_origin()
 def analyze_resume():
     """
     Main endpoint for resume analysis
     Expects: multipart/form-data with 'resume' (PDF file) and optional 'job_description'
+    With ?async=1 the analysis runs in the background: responds 202 with a job id to poll
+    With ?stream=1 the analysis is streamed as server-sent events while Gemini generates it
     """
     try:
-        # Handle preflight request
-        if request.method == 'OPTIONS':
-            return '', 200
         # Get uploaded file
         if 'resume' not in request.files:
             return jsonify({
@@ -67,6 +103,25 @@ def analyze_resume():
                 "message": "Please provide a valid resume in PDF format"
             }), 400
         
+        # Queue the work and answer immediately when the client will poll for it
+        if request.args.get('async') == '1':
+            ai_analyzer = _get_ai_analyzer()
+            if pdf_processor is None or ai_analyzer is None or not (analysis_jobs and analysis_jobs.available):
+                return jsonify({"error": "AI analysis service not available"}), 500
+            try:
+                job_id = analysis_jobs.submit(_analyze_pdf, ai_analyzer, file.filename, file.read(), job_description)
+            except JobQueueFull:
+                return jsonify({
+                    "error": "Too many pending analyses",
+                    "message": "The server is busy, please retry shortly"
+                }), 503, {"Retry-After": str(analysis_jobs.retry_after)}
+            return jsonify({
+                "success": True,
+                "job_id": job_id,
+                "status": analysis_jobs.PENDING,
+                "status_url": url_for('api.analysis_job_status', job_id=job_id)
+            }), 202
+        
         # Extract text from PDF
         if pdf_processor is None:
             return jsonify({"error": "PDF processing service not available"}), 500
@@ -80,15 +135,27 @@ def analyze_resume():
         
         resume_text = result
         
-        # Get text statistics for logging
-        if pdf_processor is None:
-            return jsonify({"error": "PDF processing service not available"}), 500
-        text_stats = pdf_processor.get_text_stats(resume_text)
-        print(f"PDF processed successfully: {text_stats}")
+        # Text statistics feed the INFO log, the stream metadata and ?debug=1;
+        # skip computing them when none of those will use them
+        stream = request.args.get('stream') == '1'
+        debug = request.args.get('debug') == '1'
+        text_stats = None
+        if stream or debug or logger.isEnabledFor(logging.INFO):
+            text_stats = pdf_processor.get_text_stats(resume_text)
+            logger.info("PDF processed successfully: %s", text_stats)
         
         # Perform AI analysis
+        ai_analyzer = _get_ai_analyzer()
         if ai_analyzer is None:
             return jsonify({"error": "AI analysis service not available"}), 500
+        
+        if stream:
+            return _stream_analysis(ai_analyzer, resume_text, job_description, {
+                "file_name": file.filename,
+                "text_stats": text_stats,
+                "has_job_description": bool(job_description)
+            })
+        
         analysis_result = ai_analyzer.analyze_resume(resume_text, job_description)
         
         # Check if analysis failed
@@ -106,38 +173,147 @@ def analyze_resume():
                 "details": "Please try again or contact support if the problem persists"
             }), 500
         
-        # Return successful analysis
-        return jsonify({
+        # Return successful analysis; processing metadata is only useful
+        # when debugging, so keep it out of the default payload
+        response = {
             "success": True,
-            "analysis": analysis_result,
-            "metadata": {
+            "analysis": analysis_result
+        }
+        if debug:
+            response["metadata"] = {
                 "file_name": file.filename,
                 "text_stats": text_stats,
                 "has_job_description": bool(job_description),
                 "job_description_length": len(job_description) if job_description else 0
             }
-        })
+        return jsonify(response)
         
     except Exception as e:
-        print(f"Unexpected error in analyze_resume: {str(e)}")
+        logger.exception(f"Unexpected error in analyze_resume: {e}")
         return jsonify({
             "error": "Internal server error",
             "message": "An unexpected error occurred while processing your resume",
             "details": "Please try again later or contact support"
         }), 500
 
-@api_bp.route('/extract-text', methods=['POST', 'OPTIONS'])
+def _stream_analysis(ai_analyzer, resume_text: str, job_description: str, metadata: dict):
+    """
+    Stream an analysis as server-sent events
+    Events: 'metadata' first, then 'chunk' with raw model output as it arrives,
+    and finally 'result' with the parsed analysis or 'error'
+    """
+    def sse(event: str, data) -> str:
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    
+    def generate():
+        yield sse("metadata", metadata)
+        for event in ai_analyzer.stream_analysis(resume_text, job_description):
+            event_type = event.pop("type")
+            yield sse(event_type, event)
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@api_bp.route('/analyze-resume/<job_id>', methods=['GET'])
+@cross_origin()
+def analysis_job_status(job_id):
+    """
+    Poll a background analysis started with POST /analyze-resume?async=1
+    Returns the job status (pending, running, done, failed) and, once finished, its result
+    """
+    if not (analysis_jobs and analysis_jobs.available):
+        return jsonify({"error": "Background analysis not available"}), 500
+    
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        return jsonify({
+            "error": "Job not found",
+            "message": "Unknown or expired analysis job"
+        }), 404
+    return jsonify(job)
+
+@api_bp.route('/analyze-batch', methods=['POST'])
+@cross_origin()
+def analyze_batch():
+    """
+    Analyze several resumes against one optional job description concurrently
+    Expects: multipart/form-data with one or more 'resume' files and optional 'job_description'
+    Returns a per-file result list in upload order
+    """
+    try:
+        files = request.files.getlist('resume')
+        if not files:
+            return jsonify({
+                "error": "No resume file provided",
+                "message": "Please upload one or more resumes in PDF format"
+            }), 400
+        
+        if len(files) > config.BATCH_MAX_FILES:
+            return jsonify({
+                "error": "Too many files",
+                "message": f"Please upload at most {config.BATCH_MAX_FILES} resumes per batch"
+            }), 400
+        
+        if pdf_processor is None:
+            return jsonify({"error": "PDF processing service not available"}), 500
+        ai_analyzer = _get_ai_analyzer()
+        if ai_analyzer is None:
+            return jsonify({"error": "AI analysis service not available"}), 500
+        
+        job_description = request.form.get('job_description', '').strip()
+        
+        # Validate and read every upload on the request thread; workers only
+        # see bytes, so nothing touches the request stream concurrently
+        results = [None] * len(files)
+        pending = []
+        for index, file in enumerate(files):
+            is_valid, validation_errors = FileValidator.validate_upload(file)
+            if not is_valid:
+                results[index] = {
+                    "file_name": file.filename,
+                    "success": False,
+                    "error": "File validation failed",
+                    "details": validation_errors
+                }
+            else:
+                pending.append((index, file.filename, file.read()))
+        
+        # Gemini concurrency is still capped process-wide by the gemini_client semaphore
+        if pending:
+            with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+                futures = [
+                    (index, executor.submit(_analyze_pdf, ai_analyzer, file_name, pdf_bytes, job_description))
+                    for index, file_name, pdf_bytes in pending
+                ]
+                for index, future in futures:
+                    results[index] = future.result()
+        
+        return jsonify({
+            "success": True,
+            "results": results,
+            "has_job_description": bool(job_description)
+        })
+        
+    except Exception as e:
+        logger.exception(f"Unexpected error in analyze_batch: {e}")
+        return jsonify({
+            "error": "Internal server error",
+            "message": "An unexpected error occurred while processing your resumes",
+            "details": "Please try again later or contact support"
+        }), 500
+
+@api_bp.route('/extract-text', methods=['POST'])
 @cross_origin()
 def extract_text():
     """
     Extract text from uploaded PDF without AI analysis
     Expects: multipart/form-data with 'resume' (PDF file)
+    With ?stream=1 the text is streamed as NDJSON, one {"page", "text"} object per page
     """
     try:
-        # Handle preflight request
-        if request.method == 'OPTIONS':
-            return '', 200
-            
         # Get uploaded file
         if 'resume' not in request.files:
             return jsonify({
@@ -157,9 +333,12 @@ def extract_text():
             }), 400
         
         # Extract text using PDF processor
-        file.seek(0)  # Reset file pointer
         if pdf_processor is None:
             return jsonify({"error": "PDF processing service not available"}), 500
+        
+        if request.args.get('stream') == '1':
+            return _stream_pages(file)
+        
         success, result = pdf_processor.extract_text_from_pdf(file)
         
         if not success:
@@ -176,14 +355,56 @@ def extract_text():
         }), 200
     
     except Exception as e:
-        logger.error(f"Error in extract_text endpoint: {str(e)}")
+        logger.exception(f"Error in extract_text endpoint: {e}")
         return jsonify({
             "error": "Internal server error",
             "message": "An unexpected error occurred during text extraction",
             "details": "Please try again later or contact support"
         }), 500
 
-@api_bp.route('/validate-file', methods=['POST', 'OPTIONS'])
+def _stream_pages(file):
+    """Stream extracted page text as NDJSON so clients can start before extraction ends"""
+    pages = pdf_processor.iter_page_text(file)
+    
+    # Pull pages up front until the text can be judged as a resume, so empty,
+    # unreadable and non-resume PDFs still get the same error as the JSON path;
+    # the resume check never looks past RESUME_SCAN_LIMIT characters
+    buffered = []
+    text = ""
+    try:
+        for page in pages:
+            buffered.append(page)
+            text = "\n".join(page_text for _, page_text in buffered)
+            if (len(text) >= FileValidator.RESUME_SCAN_LIMIT
+                    or pdf_processor.check_extracted_text(text) is None):
+                break
+        error = pdf_processor.check_extracted_text(text)
+    except ValueError as e:
+        error = str(e)
+    
+    if error:
+        return jsonify({
+            "error": "Text extraction failed",
+            "message": error,
+            "details": "Unable to extract text from the uploaded PDF"
+        }), 500
+    
+    def generate():
+        try:
+            for page_num, page_text in buffered:
+                yield json.dumps({"page": page_num, "text": page_text}) + "\n"
+            for page_num, page_text in pages:
+                yield json.dumps({"page": page_num, "text": page_text}) + "\n"
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band rather
+            # than ending the body early
+            logger.exception(f"Error streaming extracted text: {e}")
+            message = str(e) if isinstance(e, ValueError) else "An unexpected error occurred during text extraction"
+            yield json.dumps({"error": "Text extraction failed", "message": message}) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@api_bp.route('/validate-file', methods=['POST'])
 @cross_origin()
 def validate_file():
     """
@@ -191,10 +412,6 @@ def validate_file():
     Expects: multipart/form-data with 'resume' (PDF file)
     """
     try:
-        # Handle preflight request
-        if request.method == 'OPTIONS':
-            return '', 200
-            
         # Get uploaded file
         if 'resume' not in request.files:
             return jsonify({
@@ -220,11 +437,11 @@ def validate_file():
             "success": True,
             "valid": True,
             "message": "File is valid and ready for processing",
-            "filename": secure_filename(file.filename)
+            "filename": _secure_filename(file.filename)
         }), 200
     
     except Exception as e:
-        logger.error(f"Error in validate_file endpoint: {str(e)}")
+        logger.exception(f"Error in validate_file endpoint: {e}")
         return jsonify({
             "success": False,
             "valid": False,
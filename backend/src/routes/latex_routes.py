@@ -1,26 +1,83 @@
 """
 LaTeX Editor API Routes
 """
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, Response, request, jsonify, send_file, stream_with_context, url_for
 from flask_cors import cross_origin
-import io
+import json
 import logging
+import tempfile
+from typing import Callable, Dict, Iterator
+from src.utils.static_response import static_json
 
 logger = logging.getLogger(__name__)
 
 latex_bp = Blueprint('latex', __name__)
 
 # Initialize services
+# The AI LaTeX service (and the Gemini SDK behind it) is loaded on the first AI
+# request, so the editor endpoints work without it
 try:
     from src.services.latex_service import LaTeXService, ResumeData
-    from src.services.ai_latex_service import AILaTeXService
+    from src.services.job_queue import JobQueueFull, analysis_jobs
     latex_service = LaTeXService()
-    ai_latex_service = AILaTeXService()
-    logger.info("LaTeX and AI LaTeX services initialized")
+    logger.info("LaTeX service initialized")
 except Exception as e:
     logger.error(f"Failed to initialize LaTeX service: {e}")
     latex_service = None
-    ai_latex_service = None
+    analysis_jobs = None
+
+
+def _get_ai_latex_service():
+    """Return the shared AI LaTeX service, or None if it cannot be initialized"""
+    try:
+        from src.services.ai_latex_service import get_ai_latex_service
+        return get_ai_latex_service()
+    except Exception as e:
+        logger.error(f"AI LaTeX service initialization error: {e}")
+        return None
+
+
+def _run_ai(task: Callable[[], dict]):
+    """
+    Run an AI call and return its JSON response
+    With ?async=1 the call is queued instead: responds 202 with a job id to poll
+    
+    Args:
+        task: Makes the AI call and builds the response body; it runs outside
+            the request context when queued, so it must not touch `request`
+    """
+    if request.args.get('async') == '1':
+        if not (analysis_jobs and analysis_jobs.available):
+            return jsonify({"error": "Background jobs not available"}), 500
+        try:
+            job_id = analysis_jobs.submit(task)
+        except JobQueueFull:
+            return jsonify({
+                "error": "Too many pending AI requests",
+                "message": "The server is busy, please retry shortly"
+            }), 503, {"Retry-After": str(analysis_jobs.retry_after)}
+        return jsonify({
+            "success": True,
+            "job_id": job_id,
+            "status": analysis_jobs.PENDING,
+            "status_url": url_for('latex.ai_job_status', job_id=job_id)
+        }), 202
+    
+    return jsonify(task())
+
+
+def _stream_events(events: Iterator[Dict]) -> Response:
+    """Send {"type": ..., ...} events from an AI service as server-sent events"""
+    def generate():
+        for event in events:
+            event_type = event.pop("type")
+            yield f"event: {event_type}\ndata: {json.dumps(event)}\n\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @latex_bp.route('/validate', methods=['POST'])
@@ -37,7 +94,7 @@ def validate_latex():
         - errors: list of error messages
     """
     try:
-        data = request.get_json()
+        data = request.get_json(cache=False)
         if not data or 'latex_code' not in data:
             return jsonify({
                 "error": "Missing latex_code in request body"
@@ -73,7 +130,7 @@ def compile_latex():
         - PDF file or error message
     """
     try:
-        data = request.get_json()
+        data = request.get_json(cache=False)
         if not data or 'latex_code' not in data:
             return jsonify({
                 "error": "Missing latex_code in request body"
@@ -87,13 +144,21 @@ def compile_latex():
         success, result = latex_service.compile_to_pdf(latex_code)
         
         if success:
-            # Return PDF as downloadable file
-            return send_file(
-                io.BytesIO(result),
+            # Return PDF as downloadable file. Backing it with a real (already
+            # unlinked) temp file lets Gunicorn send it with sendfile(2) instead
+            # of copying it through Python in chunks
+            pdf_file = tempfile.TemporaryFile()
+            pdf_file.write(result)
+            pdf_file.seek(0)
+            response = send_file(
+                pdf_file,
                 mimetype='application/pdf',
                 as_attachment=True,
                 download_name='resume.pdf'
             )
+            # send_file can't size an arbitrary file object
+            response.content_length = len(result)
+            return response
         else:
             return jsonify({
                 "error": "Compilation failed",
@@ -118,7 +183,7 @@ def format_latex():
         - formatted_code: string
     """
     try:
-        data = request.get_json()
+        data = request.get_json(cache=False)
         if not data or 'latex_code' not in data:
             return jsonify({
                 "error": "Missing latex_code in request body"
@@ -154,7 +219,7 @@ def generate_from_data():
         - latex_code: Generated LaTeX code
     """
     try:
-        data = request.get_json()
+        data = request.get_json(cache=False)
         if not data or 'data' not in data:
             return jsonify({
                 "error": "Missing resume data in request body"
@@ -167,21 +232,7 @@ def generate_from_data():
             return jsonify({"error": "LaTeX service unavailable"}), 500
         
         # Convert dict to ResumeData
-        resume = ResumeData(
-            name=resume_data.get('name', ''),
-            email=resume_data.get('email', ''),
-            phone=resume_data.get('phone', ''),
-            location=resume_data.get('location', ''),
-            linkedin=resume_data.get('linkedin', ''),
-            github=resume_data.get('github', ''),
-            website=resume_data.get('website', ''),
-            summary=resume_data.get('summary', ''),
-            experience=resume_data.get('experience', []),
-            education=resume_data.get('education', []),
-            skills=resume_data.get('skills', []),
-            projects=resume_data.get('projects', []),
-            certifications=resume_data.get('certifications', [])
-        )
+        resume = ResumeData.from_dict(resume_data)
         
         latex_code = latex_service.generate_latex_from_data(resume, template_name)
         
@@ -210,7 +261,7 @@ def extract_sections():
         - sections: list of section objects
     """
     try:
-        data = request.get_json()
+        data = request.get_json(cache=False)
         if not data or 'latex_code' not in data:
             return jsonify({
                 "error": "Missing latex_code in request body"
@@ -246,7 +297,7 @@ def get_starter():
     """
     try:
         from src.templates.latex_templates import get_starter_template
-        return jsonify({
+        return static_json('starter', lambda: {
             "latex_code": get_starter_template()
         })
     except Exception as e:
@@ -263,6 +314,8 @@ def get_starter():
 def ai_improve_resume():
     """
     Use AI to suggest improvements to the resume
+    With ?stream=1 each part (score, suggestions, improved sections) is sent as a
+    server-sent 'part' event as soon as it is ready, followed by 'result' or 'error'
     
     Request body:
         - latex_code: string
@@ -272,19 +325,24 @@ def ai_improve_resume():
         - suggestions and improved code
     """
     try:
-        data = request.get_json()
+        data = request.get_json(cache=False)
         if not data or 'latex_code' not in data:
             return jsonify({"error": "Missing latex_code"}), 400
         
+        ai_latex_service = _get_ai_latex_service()
         if ai_latex_service is None:
             return jsonify({"error": "AI service unavailable"}), 500
         
-        result = ai_latex_service.improve_resume(
+        if request.args.get('stream') == '1':
+            return _stream_events(ai_latex_service.stream_improvement(
+                data['latex_code'],
+                data.get('job_description', '')
+            ))
+        
+        return _run_ai(lambda: ai_latex_service.improve_resume(
             data['latex_code'],
             data.get('job_description', '')
-        )
-        
-        return jsonify(result)
+        ))
         
     except Exception as e:
         logger.error(f"AI improve error: {e}")
@@ -306,21 +364,20 @@ def ai_generate_bullets():
         - bullets: list of strings
     """
     try:
-        data = request.get_json()
+        data = request.get_json(cache=False)
         required = ['role', 'company', 'responsibilities']
         if not data or not all(k in data for k in required):
             return jsonify({"error": f"Missing required fields: {required}"}), 400
         
+        ai_latex_service = _get_ai_latex_service()
         if ai_latex_service is None:
             return jsonify({"error": "AI service unavailable"}), 500
         
-        bullets = ai_latex_service.generate_bullet_points(
+        return _run_ai(lambda: {"bullets": ai_latex_service.generate_bullet_points(
             data['role'],
             data['company'],
             data['responsibilities']
-        )
-        
-        return jsonify({"bullets": bullets})
+        )})
         
     except Exception as e:
         logger.error(f"AI bullets error: {e}")
@@ -340,16 +397,15 @@ def ai_ats_check():
         - ATS analysis results
     """
     try:
-        data = request.get_json()
+        data = request.get_json(cache=False)
         if not data or 'latex_code' not in data:
             return jsonify({"error": "Missing latex_code"}), 400
         
+        ai_latex_service = _get_ai_latex_service()
         if ai_latex_service is None:
             return jsonify({"error": "AI service unavailable"}), 500
         
-        result = ai_latex_service.check_ats_compatibility(data['latex_code'])
-        
-        return jsonify(result)
+        return _run_ai(lambda: ai_latex_service.check_ats_compatibility(data['latex_code']))
         
     except Exception as e:
         logger.error(f"ATS check error: {e}")
@@ -370,19 +426,18 @@ def ai_suggest_skills():
         - suggested_skills: list of strings
     """
     try:
-        data = request.get_json()
+        data = request.get_json(cache=False)
         if not data or 'job_description' not in data:
             return jsonify({"error": "Missing job_description"}), 400
         
+        ai_latex_service = _get_ai_latex_service()
         if ai_latex_service is None:
             return jsonify({"error": "AI service unavailable"}), 500
         
-        skills = ai_latex_service.suggest_skills(
+        return _run_ai(lambda: {"suggested_skills": ai_latex_service.suggest_skills(
             data.get('current_skills', []),
             data['job_description']
-        )
-        
-        return jsonify({"suggested_skills": skills})
+        )})
         
     except Exception as e:
         logger.error(f"Skill suggestion error: {e}")
@@ -403,20 +458,77 @@ def ai_improve_section():
         - improved_content: string
     """
     try:
-        data = request.get_json()
+        data = request.get_json(cache=False)
         if not data or 'section_name' not in data or 'section_content' not in data:
             return jsonify({"error": "Missing section_name or section_content"}), 400
         
+        ai_latex_service = _get_ai_latex_service()
         if ai_latex_service is None:
             return jsonify({"error": "AI service unavailable"}), 500
         
-        improved = ai_latex_service.improve_section(
+        return _run_ai(lambda: {"improved_content": ai_latex_service.improve_section(
             data['section_name'],
             data['section_content']
-        )
-        
-        return jsonify({"improved_content": improved})
+        )})
         
     except Exception as e:
         logger.error(f"Section improvement error: {e}")
         return jsonify({"error": str(e)}), 500
+
+
+@latex_bp.route('/ai/analyze-all', methods=['POST'])
+@cross_origin()
+def ai_analyze_all():
+    """
+    Run improvement suggestions, the ATS check and skill suggestions in one request
+    
+    Request body:
+        - latex_code: string
+        - job_description: string (optional; skill suggestions need it)
+        - current_skills: list of strings (optional)
+    
+    Returns:
+        - improvements: same as /ai/improve
+        - ats: same as /ai/ats-check
+        - suggested_skills: list of strings
+    """
+    try:
+        data = request.get_json(cache=False)
+        if not data or 'latex_code' not in data:
+            return jsonify({"error": "Missing latex_code"}), 400
+        
+        ai_latex_service = _get_ai_latex_service()
+        if ai_latex_service is None:
+            return jsonify({"error": "AI service unavailable"}), 500
+        
+        return _run_ai(lambda: ai_latex_service.analyze_all(
+            data['latex_code'],
+            data.get('job_description', ''),
+            data.get('current_skills', [])
+        ))
+        
+    except Exception as e:
+        logger.error(f"AI analyze-all error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@latex_bp.route('/ai/jobs/<job_id>', methods=['GET'])
+@cross_origin()
+def ai_job_status(job_id: str):
+    """
+    Poll an AI request started with ?async=1
+    
+    Path params:
+        - job_id: Job identifier returned with the 202 response
+    
+    Returns:
+        - status: pending, running, done or failed
+        - result: the endpoint's usual response body once done
+    """
+    if not (analysis_jobs and analysis_jobs.available):
+        return jsonify({"error": "Background jobs not available"}), 500
+    
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+    return jsonify(job)
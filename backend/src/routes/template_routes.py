@@ -4,11 +4,64 @@ Template API Routes
 from flask import Blueprint, request, jsonify
 from flask_cors import cross_origin
 import logging
+from src.services.latex_service import ResumeData
+from src.utils.static_response import static_json
 
 logger = logging.getLogger(__name__)
 
 template_bp = Blueprint('templates', __name__)
 
+# Fixed sample resume rendered by the template previews
+_SAMPLE_DATA = ResumeData(
+    name="John Doe",
+    email="john.doe@example.com",
+    phone="(555) 123-4567",
+    location="San Francisco, CA",
+    linkedin="https://linkedin.com/in/johndoe",
+    github="https://github.com/johndoe",
+    summary="Experienced software engineer with 5+ years of expertise in full-stack development.",
+    experience=[
+        {
+            "title": "Senior Software Engineer",
+            "company": "Tech Company Inc.",
+            "location": "San Francisco, CA",
+            "dates": "2022 - Present",
+            "responsibilities": [
+                "Led development of microservices architecture",
+                "Mentored junior developers",
+                "Improved system performance by 40%"
+            ]
+        },
+        {
+            "title": "Software Engineer",
+            "company": "Startup Co.",
+            "location": "New York, NY",
+            "dates": "2019 - 2022",
+            "responsibilities": [
+                "Developed RESTful APIs",
+                "Built React frontend applications"
+            ]
+        }
+    ],
+    education=[
+        {
+            "degree": "B.S. Computer Science",
+            "institution": "University of California, Berkeley",
+            "dates": "2015 - 2019",
+            "gpa": "3.8"
+        }
+    ],
+    skills=["Python", "JavaScript", "React", "Node.js", "AWS", "Docker", "PostgreSQL"],
+    projects=[
+        {
+            "name": "Open Source Project",
+            "description": "Contributed to popular open source framework",
+            "technologies": ["Python", "FastAPI"]
+        }
+    ],
+    certifications=["AWS Certified Solutions Architect", "Google Cloud Professional"]
+)
+
 
 @template_bp.route('/', methods=['GET'])
 @cross_origin()
@@ -21,12 +74,15 @@ def list_templates():
     """
     try:
         from src.templates.latex_templates import get_all_templates
-        templates = get_all_templates()
         
-        return jsonify({
-            "templates": templates,
-            "count": len(templates)
-        })
+        def build():
+            templates = get_all_templates()
+            return {
+                "templates": templates,
+                "count": len(templates)
+            }
+        
+        return static_json('templates', build)
         
     except Exception as e:
         logger.error(f"Error listing templates: {e}")
@@ -49,7 +105,7 @@ def get_template_info(template_id: str):
         from src.templates.latex_templates import get_template
         template = get_template(template_id)
         
-        return jsonify({
+        return static_json(f'template:{template.name}', lambda: {
             "id": template.name,
             "name": template.name.title(),
             "description": template.description
@@ -77,71 +133,20 @@ def preview_template(template_id: str):
     """
     try:
         from src.templates.latex_templates import get_template
-        from src.services.latex_service import ResumeData
-        
         template = get_template(template_id)
         
-        # Sample data for preview
-        sample_data = ResumeData(
-            name="John Doe",
-            email="john.doe@example.com",
-            phone="(555) 123-4567",
-            location="San Francisco, CA",
-            linkedin="https://linkedin.com/in/johndoe",
-            github="https://github.com/johndoe",
-            summary="Experienced software engineer with 5+ years of expertise in full-stack development.",
-            experience=[
-                {
-                    "title": "Senior Software Engineer",
-                    "company": "Tech Company Inc.",
-                    "location": "San Francisco, CA",
-                    "dates": "2022 - Present",
-                    "responsibilities": [
-                        "Led development of microservices architecture",
-                        "Mentored junior developers",
-                        "Improved system performance by 40%"
-                    ]
-                },
-                {
-                    "title": "Software Engineer",
-                    "company": "Startup Co.",
-                    "location": "New York, NY",
-                    "dates": "2019 - 2022",
-                    "responsibilities": [
-                        "Developed RESTful APIs",
-                        "Built React frontend applications"
-                    ]
-                }
-            ],
-            education=[
-                {
-                    "degree": "B.S. Computer Science",
-                    "institution": "University of California, Berkeley",
-                    "dates": "2015 - 2019",
-                    "gpa": "3.8"
+        # The preview is rendered from fixed sample data, so it is built once per template
+        def build():
+            return {
+                "latex_code": template.generate(_SAMPLE_DATA),
+                "template": {
+                    "id": template.name,
+                    "name": template.name.title(),
+                    "description": template.description
                 }
-            ],
-            skills=["Python", "JavaScript", "React", "Node.js", "AWS", "Docker", "PostgreSQL"],
-            projects=[
-                {
-                    "name": "Open Source Project",
-                    "description": "Contributed to popular open source framework",
-                    "technologies": ["Python", "FastAPI"]
-                }
-            ],
-            certifications=["AWS Certified Solutions Architect", "Google Cloud Professional"]
-        )
-        
-        latex_code = template.generate(sample_data)
-        
-        return jsonify({
-            "latex_code": latex_code,
-            "template": {
-                "id": template.name,
-                "name": template.name.title(),
-                "description": template.description
             }
-        })
+        
+        return static_json(f'preview:{template.name}', build)
         
     except ValueError as e:
         return jsonify({"error": str(e)}), 404
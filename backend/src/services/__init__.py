@@ -1,15 +1,24 @@
 """
 Services module - Contains all business logic services
+Exports are imported on first access, so importing one service (e.g. the
+LaTeX service) doesn't load the Gemini SDK or PyMuPDF with it
 """
-from .ai_service import AIAnalyzer
-from .pdf_service import PDFProcessor
-from .latex_service import LaTeXService, ResumeData
-from .ai_latex_service import AILaTeXService
-
-__all__ = [
-    'AIAnalyzer',
-    'PDFProcessor', 
-    'LaTeXService',
-    'ResumeData',
-    'AILaTeXService'
-]
\ No newline at end of file
+import importlib
+
+_EXPORTS = {
+    'AIAnalyzer': '.ai_service',
+    'PDFProcessor': '.pdf_service',
+    'LaTeXService': '.latex_service',
+    'ResumeData': '.latex_service',
+    'AILaTeXService': '.ai_latex_service',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
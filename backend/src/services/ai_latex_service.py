@@ -2,17 +2,158 @@
 AI LaTeX Integration Service
 Uses AI to enhance and improve LaTeX resume code
 """
+import copy
 import google.generativeai as genai
 import json
-import re
 import logging
-from typing import Optional, Dict, List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from typing import Any, Callable, Iterator, Optional, Dict, List
 from src.config.settings import get_config
+from src.services import gemini_client
+from src.utils.json_extract import iter_json_spans
+from src.utils.response_cache import ResponseCache
+
+# orjson parses model responses several times faster; its JSONDecodeError
+# subclasses the stdlib one, so callers catch json.JSONDecodeError either way
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
 logger = logging.getLogger(__name__)
 config = get_config()
 
 
+# Prompt templates, filled with str.format_map (literal braces are doubled)
+BULLET_POINTS_PROMPT = """Generate 3-5 impactful resume bullet points for the following role.
+Use the XYZ formula: Accomplished [X] by [Y], resulting in [Z].
+Include metrics and quantifiable results where possible.
+
+Role: {role}
+Company: {company}
+Responsibilities: {responsibilities}
+
+Return ONLY a JSON array of strings, no other text:
+["Bullet point 1", "Bullet point 2", ...]
+"""
+
+IMPROVE_SECTION_PROMPT = """Improve this resume {section_name} section for maximum impact.
+Keep the LaTeX formatting intact.
+Make it more professional, impactful, and ATS-friendly.
+Use action verbs and quantify achievements where possible.
+
+Current content:
+{section_content}
+
+Return ONLY the improved LaTeX code, no explanations.
+"""
+
+ATS_CHECK_PROMPT = """Analyze this LaTeX resume for ATS (Applicant Tracking System) compatibility.
+
+LaTeX Resume:
+{latex_code}
+
+Return a JSON object with this structure:
+{{
+    "ats_score": number (0-100),
+    "issues": ["issue 1", "issue 2", ...],
+    "recommendations": ["recommendation 1", "recommendation 2", ...],
+    "keyword_analysis": {{
+        "found_keywords": ["keyword1", "keyword2"],
+        "missing_common_keywords": ["keyword1", "keyword2"]
+    }}
+}}
+
+Return ONLY the JSON object, no other text.
+"""
+
+SUGGEST_SKILLS_PROMPT = """Based on this job description, suggest additional skills that should be added to the resume.
+Only suggest skills that are commonly required for this type of role.
+Do not suggest skills already listed.
+
+Current skills: {current_skills}
+
+Job Description:
+{job_description}
+
+Return ONLY a JSON array of suggested skills:
+["skill1", "skill2", ...]
+"""
+
+# The review is split into three small prompts that run in parallel: each
+# returns one part of the result, so the wall-clock time is that of the
+# slowest part rather than one long generation of the whole object
+# The resume and job description are spliced between these two halves
+IMPROVEMENT_PROMPT_PREFIX = """You are an expert resume writer and LaTeX professional.
+{task}
+
+LaTeX Resume:
+"""
+
+IMPROVEMENT_PROMPT_SUFFIX = """
+
+Return a JSON object with this structure:
+{schema}
+
+Return ONLY the JSON object.
+"""
+
+# (name, task, schema, defaults): each part is requested separately so the parts
+# run in parallel; defaults fill in a part's keys when its call fails
+IMPROVEMENT_PARTS = (
+    (
+        "score",
+        "Score this LaTeX resume and give a one or two sentence overall assessment.",
+        """{
+    "overall_score": number (0-100),
+    "summary": "Brief overall assessment"
+}""",
+        {"overall_score": None, "summary": ""}
+    ),
+    (
+        "suggestions",
+        "Analyze this LaTeX resume and list at most 5 concrete suggestions for improvement. "
+        "Keep each issue and improvement to 20 words or fewer.",
+        """{
+    "suggestions": [
+        {
+            "section": "Section name",
+            "issue": "What's wrong",
+            "improvement": "How to fix it",
+            "priority": "high/medium/low"
+        }
+    ]
+}""",
+        {"suggestions": []}
+    ),
+    (
+        "improved_sections",
+        "Rewrite the (at most 2) weakest sections of this LaTeX resume, keeping the LaTeX formatting intact.",
+        """{
+    "improved_sections": {
+        "section_name": "Improved LaTeX code for that section"
+    }
+}""",
+        {"improved_sections": {}}
+    ),
+)
+
+# Rendered once at import: only the resume and job description vary per request
+_IMPROVEMENT_PROMPTS = tuple(
+    (IMPROVEMENT_PROMPT_PREFIX.format(task=task), IMPROVEMENT_PROMPT_SUFFIX.format(schema=schema))
+    for _, task, schema, _ in IMPROVEMENT_PARTS
+)
+
+IMPROVEMENT_JD_SECTION = """
+
+Target Job Description:
+{job_description}
+
+Tailor your suggestions to make this resume more relevant for this specific role.
+"""
+
+
 class AILaTeXService:
     """AI-powered LaTeX resume enhancement service"""
     
@@ -21,14 +162,25 @@ class AILaTeXService:
         if not config.GEMINI_API_KEY:
             raise ValueError("GEMINI_API_KEY not found in environment variables")
         
-        genai.configure(api_key=config.GEMINI_API_KEY)
+        gemini_client.configure()
         self.model = genai.GenerativeModel(
-            'models/gemini-2.5-flash',
-            generation_config={
-                "temperature": 0.3,
-                "top_p": 0.8,
-                "max_output_tokens": 8192,
-            }
+            config.GEMINI_MODEL,
+            generation_config=config.LATEX_GENERATION_CONFIG
+        )
+        # Bullet points, skill lists and single-section rewrites are short
+        # outputs that don't need the full model
+        self.light_model = genai.GenerativeModel(
+            config.GEMINI_LIGHT_MODEL,
+            generation_config=config.LATEX_GENERATION_CONFIG
+        )
+        
+        # Same store as the analyzer's; repeat edits of an unchanged resume skip the API call
+        self.response_cache = ResponseCache(
+            path=config.RESPONSE_CACHE_PATH,
+            ttl=config.RESPONSE_CACHE_TTL,
+            enabled=config.RESPONSE_CACHE_ENABLED,
+            memory_size=config.RESPONSE_CACHE_MEMORY_SIZE,
+            memory_chars=config.RESPONSE_CACHE_MEMORY_CHARS
         )
     
     def improve_resume(self, latex_code: str, job_description: str = "") -> Dict:
@@ -40,21 +192,49 @@ class AILaTeXService:
             job_description: Optional job description for targeted suggestions
             
         Returns:
-            Dictionary with suggestions and improved code
+            Dictionary with suggestions and improved code; "failed_parts" names
+            any part whose call failed and whose keys hold defaults instead
         """
-        prompt = self._create_improvement_prompt(latex_code, job_description)
+        result = {}
+        error = None
+        for part in self._iter_improvement_parts(latex_code, job_description):
+            if "error" in part:
+                error = error or part["error"]
+            else:
+                result.update(part)
         
-        try:
-            response = self.model.generate_content(prompt)
+        # Fail only if no part succeeded
+        if not result:
+            return {"error": error}
+        return self._complete_improvement(result)
+    
+    def stream_improvement(self, latex_code: str, job_description: str = "") -> Iterator[Dict]:
+        """
+        Improve the resume, yielding each part of the result as soon as it is ready
+        
+        Args:
+            latex_code: Current LaTeX resume code
+            job_description: Optional job description for targeted suggestions
             
-            if response and response.text:
-                return self._parse_improvement_response(response.text)
-            else:
-                return {"error": "No response from AI"}
-                
-        except Exception as e:
-            logger.error(f"AI improvement error: {e}")
-            return {"error": str(e)}
+        Yields:
+            {"type": "part", ...} with the keys of each completed part (score,
+            suggestions or improved sections), then a final {"type": "result",
+            "improvements": {...}} with the merged result as returned by
+            improve_resume, or {"type": "error", "error": ...} if every part failed
+        """
+        result = {}
+        error = None
+        for part in self._iter_improvement_parts(latex_code, job_description):
+            if "error" in part:
+                error = error or part["error"]
+                continue
+            result.update(part)
+            yield {"type": "part", **part}
+        
+        if result:
+            yield {"type": "result", "improvements": self._complete_improvement(result)}
+        else:
+            yield {"type": "error", "error": error}
     
     def generate_bullet_points(self, 
                                role: str, 
@@ -71,28 +251,15 @@ class AILaTeXService:
         Returns:
             List of formatted bullet points
         """
-        prompt = f"""Generate 3-5 impactful resume bullet points for the following role.
-Use the XYZ formula: Accomplished [X] by [Y], resulting in [Z].
-Include metrics and quantifiable results where possible.
-
-Role: {role}
-Company: {company}
-Responsibilities: {responsibilities}
-
-Return ONLY a JSON array of strings, no other text:
-["Bullet point 1", "Bullet point 2", ...]
-"""
+        prompt = BULLET_POINTS_PROMPT.format_map({
+            'role': role,
+            'company': company,
+            'responsibilities': responsibilities
+        })
         
         try:
-            response = self.model.generate_content(prompt)
-            if response and response.text:
-                # Parse JSON array from response
-                text = response.text.strip()
-                # Find JSON array
-                match = re.search(r'\[.*\]', text, re.DOTALL)
-                if match:
-                    return json.loads(match.group())
-            return []
+            return self._generate(prompt, lambda text: _extract_json(
+                text, '[', "Could not parse bullet points"), light=True)
         except Exception as e:
             logger.error(f"Bullet point generation error: {e}")
             return []
@@ -108,22 +275,13 @@ Return ONLY a JSON array of strings, no other text:
         Returns:
             Improved LaTeX content for the section
         """
-        prompt = f"""Improve this resume {section_name} section for maximum impact.
-Keep the LaTeX formatting intact.
-Make it more professional, impactful, and ATS-friendly.
-Use action verbs and quantify achievements where possible.
-
-Current content:
-{section_content}
-
-Return ONLY the improved LaTeX code, no explanations.
-"""
+        prompt = IMPROVE_SECTION_PROMPT.format_map({
+            'section_name': section_name,
+            'section_content': section_content
+        })
         
         try:
-            response = self.model.generate_content(prompt)
-            if response and response.text:
-                return response.text.strip()
-            return section_content
+            return self._generate(prompt, str.strip, light=True)
         except Exception as e:
             logger.error(f"Section improvement error: {e}")
             return section_content
@@ -138,38 +296,45 @@ Return ONLY the improved LaTeX code, no explanations.
         Returns:
             Dictionary with ATS score and recommendations
         """
-        prompt = f"""Analyze this LaTeX resume for ATS (Applicant Tracking System) compatibility.
-
-LaTeX Resume:
-{latex_code[:3000]}
-
-Return a JSON object with this structure:
-{{
-    "ats_score": number (0-100),
-    "issues": ["issue 1", "issue 2", ...],
-    "recommendations": ["recommendation 1", "recommendation 2", ...],
-    "keyword_analysis": {{
-        "found_keywords": ["keyword1", "keyword2"],
-        "missing_common_keywords": ["keyword1", "keyword2"]
-    }}
-}}
-
-Return ONLY the JSON object, no other text.
-"""
+        prompt = ATS_CHECK_PROMPT.format_map({'latex_code': latex_code[:3000]})
         
         try:
-            response = self.model.generate_content(prompt)
-            if response and response.text:
-                text = response.text.strip()
-                # Find JSON object
-                match = re.search(r'\{.*\}', text, re.DOTALL)
-                if match:
-                    return json.loads(match.group())
-            return {"error": "Could not parse ATS analysis"}
+            return self._generate(prompt, lambda text: _extract_json(
+                text, '{', "Could not parse ATS analysis"))
         except Exception as e:
             logger.error(f"ATS check error: {e}")
             return {"error": str(e)}
     
+    def analyze_all(self,
+                    latex_code: str,
+                    job_description: str = "",
+                    current_skills: Optional[List[str]] = None) -> Dict:
+        """
+        Run the improvement, ATS and (with a job description) skills prompts concurrently
+        
+        The three calls are independent, so the review takes one model
+        round-trip of wall-clock time instead of three.
+        
+        Args:
+            latex_code: Current LaTeX resume code
+            job_description: Optional job description for targeted suggestions
+            current_skills: Skills already in the resume, for the skills prompt
+            
+        Returns:
+            Dictionary with "improvements", "ats" and "suggested_skills"
+        """
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            improvements = executor.submit(self.improve_resume, latex_code, job_description)
+            ats = executor.submit(self.check_ats_compatibility, latex_code)
+            skills = (executor.submit(self.suggest_skills, current_skills or [], job_description)
+                      if job_description else None)
+            
+            return {
+                "improvements": improvements.result(),
+                "ats": ats.result(),
+                "suggested_skills": skills.result() if skills else []
+            }
+    
     def suggest_skills(self, current_skills: List[str], job_description: str) -> List[str]:
         """
         Suggest additional skills based on job description
@@ -181,84 +346,111 @@ Return ONLY the JSON object, no other text.
         Returns:
             List of suggested skills to add
         """
-        prompt = f"""Based on this job description, suggest additional skills that should be added to the resume.
-Only suggest skills that are commonly required for this type of role.
-Do not suggest skills already listed.
-
-Current skills: {', '.join(current_skills)}
-
-Job Description:
-{job_description[:1500]}
-
-Return ONLY a JSON array of suggested skills:
-["skill1", "skill2", ...]
-"""
+        prompt = SUGGEST_SKILLS_PROMPT.format_map({
+            'current_skills': ', '.join(current_skills),
+            'job_description': job_description[:1500]
+        })
         
         try:
-            response = self.model.generate_content(prompt)
-            if response and response.text:
-                text = response.text.strip()
-                match = re.search(r'\[.*\]', text, re.DOTALL)
-                if match:
-                    return json.loads(match.group())
-            return []
+            return self._generate(prompt, lambda text: _extract_json(
+                text, '[', "Could not parse suggested skills"), light=True)
         except Exception as e:
             logger.error(f"Skill suggestion error: {e}")
             return []
     
-    def _create_improvement_prompt(self, latex_code: str, job_description: str) -> str:
-        """Create prompt for resume improvement"""
-        base_prompt = f"""You are an expert resume writer and LaTeX professional.
-Analyze this LaTeX resume and provide suggestions for improvement.
-
-LaTeX Resume:
-{latex_code[:4000]}
-"""
-        
+    def _create_improvement_prompts(self, latex_code: str, job_description: str) -> List[str]:
+        """Create the prompts for each part of the resume improvement"""
+        job_section = ""
         if job_description:
-            base_prompt += f"""
-
-Target Job Description:
-{job_description[:1500]}
-
-Tailor your suggestions to make this resume more relevant for this specific role.
-"""
+            job_section = IMPROVEMENT_JD_SECTION.format_map({'job_description': job_description[:1500]})
         
-        base_prompt += """
-
-Return a JSON object with this structure:
-{
-    "overall_score": number (0-100),
-    "summary": "Brief overall assessment",
-    "suggestions": [
-        {
-            "section": "Section name",
-            "issue": "What's wrong",
-            "improvement": "How to fix it",
-            "priority": "high/medium/low"
-        }
-    ],
-    "improved_sections": {
-        "section_name": "Improved LaTeX code for that section"
-    }
-}
-
-Return ONLY the JSON object.
-"""
-        return base_prompt
+        resume = latex_code[:4000] + "\n" + job_section
+        return [prefix + resume + suffix for prefix, suffix in _IMPROVEMENT_PROMPTS]
+    
+    def _complete_improvement(self, result: Dict) -> Dict:
+        """Fill in defaults for the keys of failed parts and list those parts"""
+        failed_parts = []
+        for name, _, _, defaults in IMPROVEMENT_PARTS:
+            if not all(key in result for key in defaults):
+                failed_parts.append(name)
+                for key, value in copy.deepcopy(defaults).items():
+                    result.setdefault(key, value)
+        result["failed_parts"] = failed_parts
+        return result
+    
+    def _iter_improvement_parts(self, latex_code: str, job_description: str) -> Iterator[Dict]:
+        """Run the improvement prompts in parallel, yielding each parsed part as it completes"""
+        prompts = self._create_improvement_prompts(latex_code, job_description)
+        
+        with ThreadPoolExecutor(max_workers=len(prompts)) as executor:
+            futures = [executor.submit(self._request_improvement_part, prompt) for prompt in prompts]
+            for future in as_completed(futures):
+                yield future.result()
+    
+    def _request_improvement_part(self, prompt: str) -> Dict:
+        """Run one improvement prompt and parse its JSON object"""
+        try:
+            return self._generate(prompt, self._parse_improvement_response)
+        except Exception as e:
+            logger.error(f"AI improvement error: {e}")
+            return {"error": str(e)}
+    
+    def _generate(self, prompt: str, parse: Callable[[str], Any], light: bool = False) -> Any:
+        """
+        Get the model's response to a prompt, served from the response cache when possible
+        
+        The response is cached only once parse accepts it, so a malformed
+        reply is retried on the next call instead of being replayed.
+        
+        Args:
+            prompt: Prompt content to send
+            parse: Turns the response text into the result; raises ValueError if unusable
+            light: Use the smaller model, for short-output tasks
+            
+        Returns:
+            Parsed result
+        """
+        model = self.light_model if light else self.model
+        request_key = ResponseCache.make_key(prompt, model.model_name)
+        
+        cached_text = self.response_cache.get_by_key(request_key)
+        if cached_text:
+            return parse(cached_text)
+        
+        response_text = gemini_client.generate_text(model, prompt, request_key)
+        result = parse(response_text)
+        self.response_cache.put_by_key(request_key, response_text)
+        return result
     
     def _parse_improvement_response(self, response_text: str) -> Dict:
         """Parse AI improvement response"""
+        # The bracket scan skips markdown fences and prose, so the response is
+        # parsed in place rather than stripped and rewritten first
         try:
-            text = response_text.strip()
-            # Remove markdown code blocks if present
-            text = re.sub(r'```json\s*', '', text)
-            text = re.sub(r'```\s*', '', text)
-            # Find JSON object
-            match = re.search(r'\{.*\}', text, re.DOTALL)
-            if match:
-                return json.loads(match.group())
-            return {"error": "Could not parse improvement suggestions"}
+            return _extract_json(response_text, '{', "Could not parse improvement suggestions")
         except json.JSONDecodeError as e:
             logger.error(f"JSON parse error: {e}")
-            return {"error": "Invalid JSON response from AI"}
+            raise ValueError("Invalid JSON response from AI")
+
+
+def _extract_json(text: str, opener: str, error: str) -> Any:
+    """Parse the first valid JSON object ('{') or array ('[') in a model response, raising ValueError(error) if there is none"""
+    decode_error = None
+    for span in iter_json_spans(text, opener):
+        try:
+            return json_loads(span)
+        except json.JSONDecodeError as e:
+            decode_error = e
+    if decode_error is not None:
+        raise decode_error
+    raise ValueError(error)
+
+
+@lru_cache(maxsize=1)
+def get_ai_latex_service() -> AILaTeXService:
+    """
+    Return the shared AI LaTeX service, constructing it on first use
+    
+    A failed construction (e.g. no API key) raises and is retried on the next call.
+    """
+    return AILaTeXService()
@@ -2,13 +2,151 @@
 AI analysis service using Google Gemini API
 """
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+import logging
+import random
+import re
+import threading
 import time
-import os
-from typing import Optional
+from functools import lru_cache
+from typing import Iterator, Optional
 from src.config.settings import get_config
+from src.utils.json_extract import iter_json_spans
+from src.utils.response_cache import ResponseCache
+from src.services import gemini_client
+from src.services.circuit_breaker import gemini_breaker
 
+# orjson parses model responses several times faster; its JSONDecodeError
+# subclasses the stdlib one, so callers catch json.JSONDecodeError either way
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+logger = logging.getLogger(__name__)
 config = get_config()
 
+# Set when the worker is stopping: retry backoffs end early and no new retries are scheduled
+_stop_retries = threading.Event()
+
+# Static analysis instructions, sent once as the system instruction (or as
+# Gemini cached content) so each request only carries the resume and JD
+ANALYSIS_INSTRUCTIONS = """You are an expert ATS (Applicant Tracking System) optimizer and career coach.
+Analyze the provided resume and return a JSON object:
+{"ats_score": number 0-100, "fit_analysis": "markdown string", "improvement_tips": ["string", ...]}
+
+With a job description: score the match to the role; in fit_analysis cover matching skills,
+experience alignment and missing critical keywords; tips focus on keywords to add,
+formatting changes and quantified achievements.
+
+Resume only: score general ATS friendliness and strength; in fit_analysis evaluate skills
+presentation, experience descriptions and formatting/structure; tips focus on general best
+practices, formatting, and impact and metrics.
+
+Keep fit_analysis under 250 words. Give at most 5 tips, each a single actionable
+sentence of 20 words or fewer.
+"""
+
+# Upstream failures worth another attempt: timeouts, rate limits and 5xx
+RETRYABLE_ERRORS = (
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.BadGateway,
+    google_exceptions.GatewayTimeout,
+    TimeoutError,
+)
+# Failures that signal Gemini itself is degraded and count toward the circuit breaker
+TRANSIENT_ERRORS = (
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.BadGateway,
+    google_exceptions.GatewayTimeout,
+    TimeoutError,
+)
+# Request problems that fail identically on every attempt; checked first so a
+# message that happens to mention e.g. a quota project isn't retried
+NON_RETRYABLE_ERRORS = (
+    google_exceptions.InvalidArgument,
+    google_exceptions.PermissionDenied,
+    google_exceptions.Unauthenticated,
+    google_exceptions.NotFound,
+)
+# Message fallbacks for errors that reach us untyped (e.g. wrapped by the SDK)
+RETRYABLE_MESSAGE = re.compile(r'503|504|timeout|deadline|resourceexhausted|quota|unavailable', re.IGNORECASE)
+TRANSIENT_MESSAGE = re.compile(r'50[0234]|timeout|deadline|unavailable', re.IGNORECASE)
+# Classifies an error message for the user-facing text; the group name is the kind
+ERROR_CLASSIFIER = re.compile(
+    r'(?P<quota>quota|limit)|(?P<api_key>api[^a-z]*key)|(?P<timeout>504|timeout|deadline)',
+    re.IGNORECASE
+)
+
+# Per-request prompt templates, filled with str.format_map
+PROMPT_WITH_JD = """Analyze this resume against the job description.
+
+RESUME:
+{resume_text}
+
+JOB DESCRIPTION:
+{job_description}
+"""
+
+PROMPT_RESUME_ONLY = """Analyze this resume for general ATS best practices.
+
+RESUME:
+{resume_text}
+"""
+
+# Indexed by whether a usable job description was supplied
+PROMPTS = (PROMPT_RESUME_ONLY, PROMPT_WITH_JD)
+
+# Common resume section headings, matched only when they make up the whole line
+# so body text like "Experience with Kubernetes" doesn't start a new section
+_SECTION_HEADING_RE = re.compile(
+    r'^[ \t]*(?:professional summary|summary|profile|objective|work experience|experience|'
+    r'employment|technical skills|skills|education|projects|certifications)[ \t]*:?[ \t]*$',
+    re.IGNORECASE | re.MULTILINE
+)
+
+# Whitespace runs, collapsed when keying prompts
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def trim_resume(text: str, max_chars: int) -> str:
+    """
+    Trim resume text to a character budget while keeping every section represented
+    
+    Plain head truncation drops whole sections (often skills or education) from
+    long resumes. Instead, the header and each detected section share the budget:
+    sections shorter than an even share are kept whole, and what they leave
+    unused is split among the longer sections.
+    """
+    if len(text) <= max_chars:
+        return text
+    
+    headings = list(_SECTION_HEADING_RE.finditer(text))
+    if not headings:
+        return text[:max_chars]
+    
+    bounds = [0] + [h.start() for h in headings] + [len(text)]
+    segments = [text[bounds[i]:bounds[i + 1]].strip() for i in range(len(bounds) - 1)]
+    segments = [segment for segment in segments if segment]
+    
+    # Fill the shortest segments first so each longer one gets an even share
+    # of whatever budget is left; one character per segment goes to the '\n' joins
+    remaining = max(max_chars - (len(segments) - 1), 0)
+    limits = [0] * len(segments)
+    by_length = sorted(range(len(segments)), key=lambda i: len(segments[i]))
+    for n, i in enumerate(by_length):
+        limits[i] = min(len(segments[i]), remaining // (len(segments) - n))
+        remaining -= limits[i]
+    
+    trimmed = (segment[:limit].rstrip() for segment, limit in zip(segments, limits))
+    return '\n'.join(segment for segment in trimmed if segment)[:max_chars]
+
+
 class AIAnalyzer:
     """Handles AI-powered resume analysis using Google Gemini"""
     
@@ -18,14 +156,43 @@ class AIAnalyzer:
         if not config.GEMINI_API_KEY:
             raise ValueError("GEMINI_API_KEY not found in environment variables")
         
-        genai.configure(api_key=config.GEMINI_API_KEY)
+        gemini_client.configure()
         
         # Initialize model with configuration
+        self.model_name = config.GEMINI_MODEL
         self.model = genai.GenerativeModel(
-            'models/gemini-2.5-flash',
-            generation_config=config.GENERATION_CONFIG
+            self.model_name,
+            generation_config=config.GENERATION_CONFIG,
+            system_instruction=ANALYSIS_INSTRUCTIONS
+        )
+        
+        # Cache of raw responses so repeat submissions skip the API call
+        self.response_cache = ResponseCache(
+            path=config.RESPONSE_CACHE_PATH,
+            ttl=config.RESPONSE_CACHE_TTL,
+            enabled=config.RESPONSE_CACHE_ENABLED,
+            memory_size=config.RESPONSE_CACHE_MEMORY_SIZE,
+            memory_chars=config.RESPONSE_CACHE_MEMORY_CHARS
         )
     
+    def warm_up(self) -> bool:
+        """
+        Open the Gemini channel ahead of real traffic
+        
+        count_tokens is free and forces the gRPC connection and TLS handshake,
+        so the first analysis after a worker starts (or an idle spell) doesn't
+        pay for them.
+        
+        Returns:
+            True if the call succeeded
+        """
+        try:
+            self.model.count_tokens("warmup")
+            return True
+        except Exception as e:
+            logger.warning("Gemini warm-up failed: %s", e)
+            return False
+    
     def analyze_resume(self, resume_text: str, job_description: str = "", max_retries: int = None) -> dict:
         """
         Analyze resume using Google Gemini API with retry logic
@@ -45,129 +212,212 @@ class AIAnalyzer:
         if not resume_text or len(resume_text.strip()) < 50:
             return {"error": "Resume content is too short or empty. Please upload a complete resume."}
         
-        print(f"Starting AI analysis with {len(resume_text)} characters of resume text")
+        logger.info("Starting AI analysis with %d characters of resume text", len(resume_text))
         if job_description:
-            print(f"Job description provided: {len(job_description)} characters")
+            logger.info("Job description provided: %d characters", len(job_description))
         
         # Truncate inputs to limits
-        resume_text = resume_text[:config.RESUME_TEXT_LIMIT]
+        resume_text = trim_resume(resume_text, config.RESUME_TEXT_LIMIT)
         job_description = job_description[:config.JOB_DESCRIPTION_LIMIT] if job_description else ""
         
         # Choose appropriate prompt
         prompt = self._create_prompt(resume_text, job_description)
         
+        # One key, hashed once, for the response cache and in-flight coalescing
+        request_key = self._request_key(prompt)
+        
+        # Serve identical submissions from the response cache
+        cached_text = self.response_cache.get_by_key(request_key)
+        if cached_text:
+            logger.info("Analysis served from response cache")
+            return self._post_process_response(cached_text)
+        
         # Attempt analysis with retries
+        wait_time = config.RETRY_BACKOFF_BASE
         for attempt in range(max_retries):
+            # Fail fast while Gemini is known to be degraded
+            if not gemini_breaker.allow_request():
+                logger.warning("Circuit open, skipping AI call")
+                return {"error": "Error: AI service is experiencing high demand. Please try again in a few moments."}
+            
             try:
-                print(f"Generating analysis, attempt {attempt + 1}")
-                response = self.model.generate_content(prompt)
+                logger.debug("Generating analysis, attempt %d", attempt + 1)
+                # Shrink the deadline on each retry so the total wall-clock time stays
+                # well inside the Gunicorn worker timeout
+                timeout = config.GEMINI_REQUEST_TIMEOUT / (attempt + 1)
+                response_text = gemini_client.generate_text(
+                    self.model, prompt, request_key, timeout=timeout
+                )
+                gemini_breaker.record_success()
                 
-                if response and response.text:
-                    print(f"Analysis completed successfully on attempt {attempt + 1}")
-                    result = self._post_process_response(response.text)
-                    print(f"Post-process result type: {type(result)}")
+                result = self._post_process_response(response_text)
+                if result.get("parse_error"):
+                    # Malformed or truncated output isn't cached; ask again while
+                    # attempts remain, otherwise return the raw-output fallback
+                    if attempt + 1 < max_retries:
+                        logger.warning("Attempt %d returned unparseable output, retrying", attempt + 1)
+                        continue
                     return result
-                else:
-                    raise Exception("Empty response from AI model")
+                
+                logger.info("Analysis completed successfully on attempt %d", attempt + 1)
+                if "error" not in result:
+                    self.response_cache.put_by_key(request_key, response_text)
+                return result
                     
             except Exception as e:
                 error_msg = str(e)
-                print(f"Attempt {attempt + 1} failed: {error_msg}")
-                print(f"Error type: {type(e).__name__}")
+                logger.warning("Attempt %d failed (%s): %s", attempt + 1, type(e).__name__, error_msg)
+                
+                # Only transient upstream failures count toward opening the circuit
+                if self._is_transient(e):
+                    gemini_breaker.record_failure()
                 
                 # Handle specific error types
-                if self._should_retry(error_msg, attempt, max_retries):
-                    wait_time = (attempt + 1) * 2  # Exponential backoff: 2s, 4s, 6s
-                    print(f"Retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
+                if self._should_retry(e, attempt, max_retries):
+                    wait_time = self._backoff(wait_time)
                     continue
                 else:
                     result = self._handle_error(error_msg, attempt, max_retries)
-                    print(f"Returning error dict: {result}")
+                    logger.error("Analysis failed: %s", result)
                     return {"error": result}
         
-        print("Returning final error dict")
+        logger.error("Analysis failed after all retries")
         return {"error": "Unable to process resume after multiple attempts. Please try again later."}
     
-    def _create_prompt(self, resume_text: str, job_description: str) -> str:
-        """Create appropriate prompt based on whether job description is provided"""
+    def stream_analysis(self, resume_text: str, job_description: str = "",
+                        max_retries: int = None) -> Iterator[dict]:
+        """
+        Analyze a resume, yielding the model output as it is generated
         
-        base_prompt = """You are an expert ATS (Applicant Tracking System) optimizer and career coach. 
-Analyze the provided resume and return a JSON object with the following structure:
-{
-    "ats_score": number (0-100),
-    "fit_analysis": "string (markdown supported)",
-    "improvement_tips": ["string", "string", ...]
-}
-
-IMPORTANT: Return ONLY the raw JSON object. Do not include markdown formatting like ```json ... ```.
-"""
+        Args:
+            resume_text: Extracted text from resume PDF
+            job_description: Optional job description for targeted analysis
+            max_retries: Maximum number of attempts before the first chunk arrives
+            
+        Yields:
+            {"type": "chunk", "text": ...} for each piece of raw model output, then a
+            final {"type": "result", "analysis": {...}} or {"type": "error", "error": ...}
+        """
+        if max_retries is None:
+            max_retries = config.MAX_RETRIES
         
-        if job_description and len(job_description.strip()) > 10:
-            return f"""{base_prompt}
-Analyze this resume against the job description.
-
-RESUME:
-{resume_text}
-
-JOB DESCRIPTION:
-{job_description}
-
-INSTRUCTIONS:
-1. "ats_score": Evaluate how well the resume matches the job description.
-2. "fit_analysis": detailed analysis of how the candidate fits the role. Use markdown for formatting (bolding, lists).
-   - Mention matching skills.
-   - Mention experience alignment.
-   - Mention missing critical keywords.
-3. "improvement_tips": A list of concise, actionable tips to improve the ATS score. 
-   - Focus on specific keywords to add.
-   - Focus on formatting changes.
-   - Focus on quantifying achievements.
-
-Return ONLY valid JSON.
-"""
+        if not resume_text or len(resume_text.strip()) < 50:
+            yield {"type": "error", "error": "Resume content is too short or empty. Please upload a complete resume."}
+            return
         
-        else:
-            return f"""{base_prompt}
-Analyze this resume for general ATS best practices.
-
-RESUME:
-{resume_text}
-
-INSTRUCTIONS:
-1. "ats_score": Evaluate the resume's general ATS friendliness and strength.
-2. "fit_analysis": detailed analysis of the resume's strength. Use markdown.
-   - Evaluate skills presentation.
-   - Evaluate experience descriptions.
-   - Evaluate formatting and structure.
-3. "improvement_tips": A list of concise, actionable tips to improve the ATS score.
-   - Focus on general best practices.
-   - Focus on formatting.
-   - Focus on impact and metrics.
-
-Return ONLY valid JSON.
-"""
+        resume_text = trim_resume(resume_text, config.RESUME_TEXT_LIMIT)
+        job_description = job_description[:config.JOB_DESCRIPTION_LIMIT] if job_description else ""
+        prompt = self._create_prompt(resume_text, job_description)
+        
+        request_key = self._request_key(prompt)
+        cached_text = self.response_cache.get_by_key(request_key)
+        if cached_text:
+            logger.info("Analysis served from response cache")
+            yield {"type": "result", "analysis": self._post_process_response(cached_text)}
+            return
+        
+        wait_time = config.RETRY_BACKOFF_BASE
+        for attempt in range(max_retries):
+            if not gemini_breaker.allow_request():
+                logger.warning("Circuit open, skipping AI call")
+                yield {"type": "error", "error": "Error: AI service is experiencing high demand. Please try again in a few moments."}
+                return
+            
+            parts = []
+            try:
+                timeout = config.GEMINI_REQUEST_TIMEOUT / (attempt + 1)
+                for text in gemini_client.stream_text(self.model, prompt, timeout=timeout):
+                    parts.append(text)
+                    yield {"type": "chunk", "text": text}
+                if not parts:
+                    raise Exception("Empty response from AI model")
+                gemini_breaker.record_success()
+            except Exception as e:
+                error_msg = str(e)
+                logger.warning("Streaming attempt %d failed (%s): %s", attempt + 1, type(e).__name__, error_msg)
+                if self._is_transient(e):
+                    gemini_breaker.record_failure()
+                
+                # Output already sent can't be taken back, so only retry before the first chunk
+                if not parts and self._should_retry(e, attempt, max_retries):
+                    wait_time = self._backoff(wait_time)
+                    continue
+                yield {"type": "error", "error": self._handle_error(error_msg, attempt, max_retries)}
+                return
+            
+            response_text = "".join(parts)
+            result = self._post_process_response(response_text)
+            if "error" in result:
+                yield {"type": "error", "error": result["error"]}
+                return
+            
+            # The output was already streamed, so an unparseable reply can't be
+            # retried; it is returned as the fallback but never cached
+            if not result.get("parse_error"):
+                self.response_cache.put_by_key(request_key, response_text)
+            yield {"type": "result", "analysis": result}
+            return
+        
+        yield {"type": "error", "error": "Unable to process resume after multiple attempts. Please try again later."}
+    
+    def _backoff(self, wait_time: float) -> float:
+        """Sleep before a retry and return the delay used, for the next backoff step"""
+        # Decorrelated jitter keeps retries from stampeding Gemini in lockstep
+        wait_time = min(config.RETRY_BACKOFF_CAP,
+                        random.uniform(config.RETRY_BACKOFF_BASE, wait_time * 3))
+        logger.info("Retrying in %.1f seconds...", wait_time)
+        _stop_retries.wait(wait_time)
+        return wait_time
     
-    def _should_retry(self, error_msg: str, attempt: int, max_retries: int) -> bool:
+    def _create_prompt(self, resume_text: str, job_description: str) -> str:
+        """Create the per-request part of the prompt; static instructions live in the system instruction"""
+        has_job_description = bool(job_description) and len(job_description.strip()) > 10
+        # Unused keys are ignored by format_map, so one mapping serves both templates
+        return PROMPTS[has_job_description].format_map({
+            'resume_text': resume_text,
+            'job_description': job_description
+        })
+    
+    def _request_key(self, prompt: str) -> str:
+        """Key a prompt for the response cache and in-flight coalescing"""
+        # Pasted job descriptions and re-extracted PDFs often differ only in
+        # spacing and line breaks; those submissions share a key (the prompt
+        # itself is sent unchanged)
+        canonical = _WHITESPACE_RE.sub(' ', prompt).strip()
+        return ResponseCache.make_key(ANALYSIS_INSTRUCTIONS + canonical, self.model_name)
+    
+    def _should_retry(self, error: Exception, attempt: int, max_retries: int) -> bool:
         """Determine if we should retry based on error type"""
-        if attempt >= max_retries - 1:
+        if attempt >= max_retries - 1 or _stop_retries.is_set():
             return False
         
-        # Retry on timeout/quota errors
-        retry_keywords = ["504", "timeout", "deadline", "resourceexhausted", "quota"]
-        return any(keyword in error_msg.lower() for keyword in retry_keywords)
+        if isinstance(error, NON_RETRYABLE_ERRORS):
+            return False
+        
+        if isinstance(error, RETRYABLE_ERRORS):
+            return True
+        
+        return RETRYABLE_MESSAGE.search(str(error)) is not None
+    
+    def _is_transient(self, error: Exception) -> bool:
+        """Check whether an error signals upstream degradation (5xx/timeouts)"""
+        if isinstance(error, TRANSIENT_ERRORS):
+            return True
+        
+        return TRANSIENT_MESSAGE.search(str(error)) is not None
     
     def _handle_error(self, error_msg: str, attempt: int, max_retries: int) -> str:
         """Handle different types of errors with appropriate messages"""
-        error_lower = error_msg.lower()
+        # One scan of the message; quota wins over key problems, which win over timeouts
+        kinds = {match.lastgroup for match in ERROR_CLASSIFIER.finditer(error_msg)}
         
-        if "quota" in error_lower or "limit" in error_lower:
+        if "quota" in kinds:
             return "Error: AI service quota exceeded. Please try again in a few minutes."
         
-        elif "api" in error_lower and "key" in error_lower:
+        elif "api_key" in kinds:
             return "Error: AI service configuration issue. Please contact support."
         
-        elif "504" in error_msg or "timeout" in error_lower or "deadline" in error_lower:
+        elif "timeout" in kinds:
             return "Error: AI service is experiencing high demand. Please try again in a few moments."
         
         else:
@@ -179,31 +429,67 @@ Return ONLY valid JSON.
     def _post_process_response(self, response_text: str) -> dict:
         """Clean and format the AI response"""
         import json
-        import re
         
         if not response_text:
             return {"error": "Empty response from AI service."}
         
+        # JSON mode normally returns a bare object, so try it as-is first
         try:
-            # Try to find JSON block if it's wrapped in markdown code blocks
-            json_match = re.search(r'```json\s*(.*?)\s*```', response_text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-            else:
-                # If no code block, try to find the first { and last }
-                json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group(0)
-                else:
-                    json_str = response_text
-            
-            return json.loads(json_str)
+            return json_loads(response_text)
+        except json.JSONDecodeError:
+            pass
+        
+        try:
+            # Take the first balanced {...}, which also finds an object wrapped
+            # in a markdown code block without copying the block out first
+            json_str = next(iter_json_spans(response_text), response_text)
+            return json_loads(json_str)
             
         except json.JSONDecodeError:
-            print(f"Failed to parse JSON response: {response_text}")
-            # Fallback for failed JSON parsing
+            logger.warning("Failed to parse JSON response: %s", response_text)
+            # Fallback for failed JSON parsing; parse_error keeps it out of the response cache
             return {
+                "parse_error": True,
                 "ats_score": 0,
                 "fit_analysis": "Error parsing analysis results. However, here is the raw output:\n\n" + response_text,
                 "improvement_tips": ["Could not parse specific improvements."]
-            }
\ No newline at end of file
+            }
+
+
+@lru_cache(maxsize=1)
+def get_analyzer() -> AIAnalyzer:
+    """
+    Return the shared analyzer, constructing it on first use
+    
+    Keeps the Gemini SDK setup off the import path so workers boot quickly and
+    health checks work without an API key. A failed construction raises and is
+    retried on the next call.
+    """
+    return AIAnalyzer()
+
+
+def start_warmup(keepalive_seconds: int = 0) -> None:
+    """
+    Build the shared analyzer and warm its channel on a background thread
+    
+    Args:
+        keepalive_seconds: Repeat the warm-up at this interval; 0 warms once
+    """
+    def run():
+        try:
+            analyzer = get_analyzer()
+        except Exception as e:
+            logger.warning("Gemini warm-up skipped: %s", e)
+            return
+        
+        analyzer.warm_up()
+        while keepalive_seconds > 0:
+            time.sleep(keepalive_seconds)
+            analyzer.warm_up()
+    
+    threading.Thread(target=run, name='gemini-warmup', daemon=True).start()
+
+
+def stop_retries() -> None:
+    """Wake any request sleeping between retries and stop scheduling new ones"""
+    _stop_retries.set()
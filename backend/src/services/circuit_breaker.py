@@ -0,0 +1,74 @@
+"""
+Circuit breaker for upstream AI calls
+Stops hammering Gemini while it is failing and lets requests fail fast instead
+"""
+import threading
+import time
+from src.config.settings import get_config
+
+config = get_config()
+
+
+class CircuitBreaker:
+    """Process-wide closed/open/half-open breaker guarded by a lock"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, fail_threshold: int = 5, reset_after: float = 30.0):
+        """
+        Initialize the breaker
+
+        Args:
+            fail_threshold: Consecutive failures that open the circuit
+            reset_after: Seconds to stay open before letting a trial call through
+        """
+        self.fail_threshold = fail_threshold
+        self.reset_after = reset_after
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow_request(self) -> bool:
+        """Return True if a call may be attempted right now"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+
+            now = time.monotonic()
+            if now - self._opened_at >= self.reset_after:
+                # Let a single trial call probe whether the service recovered;
+                # another probe is allowed if this one never reports back
+                self._state = self.HALF_OPEN
+                self._opened_at = now
+                return True
+
+            return False
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful call"""
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        """Count a transient upstream failure, opening the circuit at the threshold"""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.fail_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+# Shared by every Gemini caller in this worker process
+gemini_breaker = CircuitBreaker(
+    fail_threshold=config.CIRCUIT_BREAKER_FAIL_THRESHOLD,
+    reset_after=config.CIRCUIT_BREAKER_RESET_SECONDS
+)
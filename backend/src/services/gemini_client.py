@@ -0,0 +1,133 @@
+"""
+Shared Gemini call gateway
+Coalesces identical in-flight prompts and bounds concurrent API calls per process
+"""
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Dict, Iterator, Optional
+import google.generativeai as genai
+from src.config.settings import get_config
+
+config = get_config()
+
+_configured = False
+_configure_lock = threading.Lock()
+
+# Caps concurrent Gemini calls across all request threads in this worker; a
+# streamed call holds its slot until the model finishes, not until the client
+# has read the whole stream
+_call_slots = threading.BoundedSemaphore(config.GEMINI_MAX_CONCURRENT_CALLS)
+
+# Marks the end of a stream_text queue
+_STREAM_END = object()
+
+# Prompts currently being generated, keyed by the caller's prompt hash
+_in_flight: Dict[str, Future] = {}
+_in_flight_lock = threading.Lock()
+
+
+def configure() -> None:
+    """Configure the Gemini SDK once per process for every service that uses it"""
+    global _configured
+    with _configure_lock:
+        if not _configured:
+            genai.configure(api_key=config.GEMINI_API_KEY, transport='grpc')
+            _configured = True
+
+
+def generate_text(model, prompt: str, key: str, timeout: Optional[float] = None) -> str:
+    """
+    Generate text for a prompt, sharing the result with concurrent identical calls
+
+    The first caller for a key performs the API call; callers arriving while it
+    is in flight wait for the same result (or exception) instead of issuing a
+    duplicate request.
+
+    Args:
+        model: Gemini GenerativeModel to call
+        prompt: Prompt content to send
+        key: Stable hash identifying the prompt (and model/instructions)
+        timeout: Seconds before the API call is abandoned (None for no limit)
+
+    Returns:
+        Response text from the model
+    """
+    with _in_flight_lock:
+        future = _in_flight.get(key)
+        is_leader = future is None
+        if is_leader:
+            future = Future()
+            _in_flight[key] = future
+
+    if not is_leader:
+        return future.result()
+
+    try:
+        with _call_slots:
+            request_options = {'timeout': timeout} if timeout else None
+            response = model.generate_content(prompt, request_options=request_options)
+
+        text = response.text if response else ""
+        if not text:
+            raise Exception("Empty response from AI model")
+
+        future.set_result(text)
+        return text
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _in_flight_lock:
+            _in_flight.pop(key, None)
+
+
+def stream_text(model, prompt: str, timeout: Optional[float] = None) -> Iterator[str]:
+    """
+    Yield response text chunks as the model generates them
+
+    Streams are not coalesced. A helper thread reads the upstream stream into
+    a queue while holding a call slot, so the slot is released as soon as the
+    model finishes rather than when a slow client has consumed every chunk;
+    the undelivered text waits in memory instead (at most one response).
+
+    Args:
+        model: Gemini GenerativeModel to call
+        prompt: Prompt content to send
+        timeout: Seconds before the streaming call is abandoned (None for no limit)
+    """
+    chunks: "queue.Queue" = queue.Queue()
+    stopped = threading.Event()
+
+    def pump():
+        try:
+            request_options = {'timeout': timeout} if timeout else None
+            with _call_slots:
+                response = model.generate_content(prompt, stream=True, request_options=request_options)
+                for chunk in response:
+                    if stopped.is_set():
+                        # The consumer went away; stop reading and free the slot
+                        break
+                    try:
+                        text = chunk.text
+                    except ValueError:
+                        # Chunks without text parts (e.g. a final metadata-only chunk)
+                        continue
+                    if text:
+                        chunks.put(text)
+        except Exception as e:
+            chunks.put(e)
+        finally:
+            chunks.put(_STREAM_END)
+
+    threading.Thread(target=pump, name='gemini-stream', daemon=True).start()
+    try:
+        while True:
+            item = chunks.get()
+            if item is _STREAM_END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stopped.set()
@@ -0,0 +1,151 @@
+"""
+Background job queue for long-running AI calls
+Runs jobs on an in-process thread pool and records their state in SQLite so any worker can answer a poll
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from typing import Any, Callable, Optional
+from src.config.settings import get_config
+from src.utils.private_files import create_private_file, default_path
+
+logger = logging.getLogger(__name__)
+config = get_config()
+
+
+class JobQueueFull(Exception):
+    """Raised by JobQueue.submit when the pending-job limit is reached"""
+
+
+class JobQueue:
+    """Thread-pool job runner with SQLite-backed status and results"""
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    def __init__(self, path: str = "", max_workers: int = 8, ttl: int = 60 * 60,
+                 max_pending: int = 32, retry_after: int = 10):
+        """
+        Initialize the job queue
+
+        Args:
+            path: SQLite database file (defaults to a private temp directory)
+            max_workers: Jobs run concurrently per worker process
+            ttl: Seconds a job record is kept after it was created
+            max_pending: Jobs queued or running at once per worker process
+            retry_after: Seconds clients turned away by a full queue should wait
+        """
+        self.path = path
+        self.ttl = ttl
+        # Threads are only started on first submit, so creating the pool in a
+        # preloaded Gunicorn master is fork-safe
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        # The executor's own queue is unbounded and jobs hold their inputs (whole
+        # PDFs for analyses) until they run, so cap queued plus running jobs
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self.retry_after = retry_after
+        self.available = True
+        self._init_db()
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> str:
+        """
+        Queue fn(*args) and return its job id; the JSON-serializable return
+        value becomes the job result
+
+        Raises:
+            JobQueueFull: max_pending jobs are already queued or running
+        """
+        if not self._slots.acquire(blocking=False):
+            raise JobQueueFull("Too many background jobs are pending")
+
+        try:
+            job_id = uuid.uuid4().hex
+            now = int(time.time())
+            with closing(self._connect()) as conn, conn:
+                # Drop expired jobs while we hold a connection anyway
+                conn.execute("DELETE FROM jobs WHERE created_at <= ?", (now - self.ttl,))
+                conn.execute(
+                    "INSERT INTO jobs (id, status, result, created_at, updated_at) VALUES (?, ?, NULL, ?, ?)",
+                    (job_id, self.PENDING, now, now)
+                )
+
+            self._executor.submit(self._run, job_id, fn, args)
+        except Exception:
+            self._slots.release()
+            raise
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Return {"job_id", "status", "result"} for a job, or None if unknown or expired"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT status, result FROM jobs WHERE id = ? AND created_at > ?",
+                (job_id, int(time.time()) - self.ttl)
+            ).fetchone()
+
+        if not row:
+            return None
+        return {
+            "job_id": job_id,
+            "status": row[0],
+            "result": json.loads(row[1]) if row[1] else None
+        }
+
+    def _run(self, job_id: str, fn: Callable[..., Any], args: tuple) -> None:
+        try:
+            self._update(job_id, self.RUNNING)
+            try:
+                result = fn(*args)
+                self._update(job_id, self.DONE, result)
+            except Exception as e:
+                logger.error(f"Job {job_id} failed: {e}")
+                self._update(job_id, self.FAILED, {"error": str(e)})
+        finally:
+            self._slots.release()
+
+    def _update(self, job_id: str, status: str, result: Any = None) -> None:
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, result = ?, updated_at = ? WHERE id = ?",
+                    (status, json.dumps(result) if result is not None else None, int(time.time()), job_id)
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Could not record status for job {job_id}: {e}")
+
+    def _connect(self) -> sqlite3.Connection:
+        # Short-lived connections keep the store safe across forks and threads
+        return sqlite3.connect(self.path, timeout=5)
+
+    def _init_db(self) -> None:
+        try:
+            if not self.path:
+                self.path = default_path('resumatch_jobs.sqlite3')
+            create_private_file(self.path)
+            with closing(self._connect()) as conn, conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS jobs ("
+                    "id TEXT PRIMARY KEY, status TEXT NOT NULL, result TEXT, "
+                    "created_at INTEGER NOT NULL, updated_at INTEGER NOT NULL)"
+                )
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Job store unavailable, background jobs disabled: {e}")
+            self.available = False
+
+
+# Shared by the analysis and AI LaTeX routes in this worker process
+analysis_jobs = JobQueue(
+    path=config.JOB_STORE_PATH,
+    max_workers=config.JOB_MAX_WORKERS,
+    ttl=config.JOB_TTL,
+    max_pending=config.JOB_MAX_PENDING,
+    retry_after=config.JOB_RETRY_AFTER
+)
@@ -1,18 +1,78 @@
 """
 LaTeX Resume Service - Handles LaTeX code generation and compilation
 """
+import hashlib
 import re
+import signal
 import subprocess
 import tempfile
 import os
 import shutil
+import threading
+from collections import Counter, OrderedDict
+from functools import lru_cache
 from typing import Optional, Tuple, Dict, List, Union
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from src.core.exceptions import LaTeXCompilationError
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Precompiled once; each is applied in a single linear pass over the document
+_BEGIN_ENV_RE = re.compile(r'\\begin\{(\w+)\}')
+_END_ENV_RE = re.compile(r'\\end\{(\w+)\}')
+_SECTION_RE = re.compile(r'\\section\*?\{([^}]+)\}')
+# Commands whose output depends on the .aux/.toc files of a previous pass
+_NEEDS_SECOND_PASS_RE = re.compile(
+    r'\\(?:(?:page|auto|eq|name)?ref|cite\w*|label|tableofcontents|listof\w+|bibliography)\b'
+)
+
+
+def _find_build_root() -> Optional[str]:
+    """Return a writable RAM-backed directory for LaTeX builds, or None for the default temp dir"""
+    candidates = ['/dev/shm']
+    if hasattr(os, 'getuid'):
+        candidates.append(f'/run/user/{os.getuid()}')
+    for path in candidates:
+        if os.path.isdir(path) and os.access(path, os.W_OK):
+            return path
+    return None
+
+
+# pdflatex writes its aux, log and output files on every pass; keep them in memory
+_BUILD_ROOT = _find_build_root()
+
+# Compiled PDFs kept per process, so re-downloading an unchanged draft skips pdflatex
+PDF_CACHE_SIZE = 32
+
+
+def _run_pdflatex(command: List[str], cwd: str, timeout: float = 60) -> bytes:
+    """
+    Run one pdflatex pass and return its console output
+    
+    pdflatex runs in its own process group with no stdin, so a document that
+    waits for input fails instead of blocking, and a timeout kills it together
+    with anything it started.
+    
+    Raises:
+        subprocess.TimeoutExpired: If the pass ran longer than timeout seconds
+    """
+    process = subprocess.Popen(
+        command,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        cwd=cwd,
+        start_new_session=True
+    )
+    try:
+        output, _ = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.communicate()
+        raise
+    return output
+
 
 @dataclass
 class ResumeSection:
@@ -45,27 +105,43 @@ class ResumeData:
         self.skills = self.skills or []
         self.projects = self.projects or []
         self.certifications = self.certifications or []
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ResumeData':
+        """Build from request JSON in one pass, ignoring unknown keys"""
+        return cls(**{key: value for key, value in data.items() if key in _RESUME_FIELDS})
+
+
+_RESUME_FIELDS = frozenset(field.name for field in fields(ResumeData))
+
+
+@lru_cache(maxsize=1)
+def _pdflatex_available() -> bool:
+    """Check once per process whether pdflatex is available on the system"""
+    # A PATH lookup settles the usual "not installed" case without spawning a process
+    if shutil.which('pdflatex') is None:
+        return False
+    try:
+        result = subprocess.run(
+            ['pdflatex', '--version'],
+            capture_output=True,
+            timeout=5
+        )
+        return result.returncode == 0
+    except (subprocess.TimeoutExpired, OSError):
+        return False
 
 
 class LaTeXService:
     """Service for LaTeX resume generation and compilation"""
     
     def __init__(self):
-        self.latex_available = self._check_latex_installation()
+        self.latex_available = _pdflatex_available()
         if not self.latex_available:
             logger.warning("LaTeX (pdflatex) not found. PDF generation will be unavailable.")
-    
-    def _check_latex_installation(self) -> bool:
-        """Check if pdflatex is available on the system"""
-        try:
-            result = subprocess.run(
-                ['pdflatex', '--version'],
-                capture_output=True,
-                timeout=5
-            )
-            return result.returncode == 0
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            return False
+        # blake2b digest of the source -> PDF bytes, most recently used last
+        self._pdf_cache: "OrderedDict[bytes, bytes]" = OrderedDict()
+        self._pdf_cache_lock = threading.Lock()
     
     def validate_latex(self, latex_code: str) -> Tuple[bool, List[str]]:
         """
@@ -80,13 +156,13 @@ class LaTeXService:
         errors = []
         
         # Check for document class
-        if not re.search(r'\\documentclass', latex_code):
+        if '\\documentclass' not in latex_code:
             errors.append("Missing \\documentclass declaration")
         
         # Check for begin/end document
-        if not re.search(r'\\begin\{document\}', latex_code):
+        if '\\begin{document}' not in latex_code:
             errors.append("Missing \\begin{document}")
-        if not re.search(r'\\end\{document\}', latex_code):
+        if '\\end{document}' not in latex_code:
             errors.append("Missing \\end{document}")
         
         # Check balanced braces
@@ -95,12 +171,17 @@ class LaTeXService:
         if open_braces != close_braces:
             errors.append(f"Unbalanced braces: {open_braces} opening, {close_braces} closing")
         
-        # Check for common environments
-        begin_envs = re.findall(r'\\begin\{(\w+)\}', latex_code)
-        end_envs = re.findall(r'\\end\{(\w+)\}', latex_code)
+        # Check for common environments; counted once instead of list.count()
+        # per occurrence, and each unbalanced environment is reported once
+        begin_envs = Counter(_BEGIN_ENV_RE.findall(latex_code))
+        end_envs = Counter(_END_ENV_RE.findall(latex_code))
         
-        for env in begin_envs:
-            if begin_envs.count(env) != end_envs.count(env):
+        for env, count in begin_envs.items():
+            if count != end_envs[env]:
+                errors.append(f"Unbalanced environment: {env}")
+        # \end{} with no \begin{} at all
+        for env in end_envs:
+            if env not in begin_envs:
                 errors.append(f"Unbalanced environment: {env}")
         
         return len(errors) == 0, errors
@@ -118,13 +199,30 @@ class LaTeXService:
         if not self.latex_available:
             return False, "LaTeX compiler (pdflatex) is not available on this system"
         
+        key = hashlib.blake2b(latex_code.encode('utf-8'), digest_size=16).digest()
+        with self._pdf_cache_lock:
+            pdf_content = self._pdf_cache.get(key)
+            if pdf_content is not None:
+                self._pdf_cache.move_to_end(key)
+                return True, pdf_content
+        
+        success, result = self._compile(latex_code)
+        if success:
+            with self._pdf_cache_lock:
+                self._pdf_cache[key] = result
+                while len(self._pdf_cache) > PDF_CACHE_SIZE:
+                    self._pdf_cache.popitem(last=False)
+        return success, result
+    
+    def _compile(self, latex_code: str) -> Tuple[bool, Union[bytes, str]]:
+        """Validate and compile LaTeX code with pdflatex (uncached)"""
         # Validate first
         is_valid, errors = self.validate_latex(latex_code)
         if not is_valid:
             return False, f"LaTeX validation failed: {'; '.join(errors)}"
         
         # Create temporary directory for compilation
-        temp_dir = tempfile.mkdtemp()
+        temp_dir = tempfile.mkdtemp(prefix='resume_', dir=_BUILD_ROOT)
         try:
             tex_file = os.path.join(temp_dir, 'resume.tex')
             pdf_file = os.path.join(temp_dir, 'resume.pdf')
@@ -133,14 +231,13 @@ class LaTeXService:
             with open(tex_file, 'w', encoding='utf-8') as f:
                 f.write(latex_code)
             
-            # Compile with pdflatex (run twice for references)
-            for _ in range(2):
-                result = subprocess.run(
-                    ['pdflatex', '-interaction=nonstopmode', '-output-directory', temp_dir, tex_file],
-                    capture_output=True,
-                    timeout=60,
-                    cwd=temp_dir
-                )
+            # Compile with pdflatex; a second pass is only needed to resolve
+            # references, which the generated resumes normally don't use
+            command = ['pdflatex', '-interaction=nonstopmode', '-no-shell-escape',
+                       '-output-directory', temp_dir, tex_file]
+            output = _run_pdflatex(command, temp_dir)
+            if _NEEDS_SECOND_PASS_RE.search(latex_code) or b'Rerun to get' in output:
+                _run_pdflatex(command, temp_dir)
             
             # Check if PDF was generated
             if os.path.exists(pdf_file):
@@ -218,13 +315,13 @@ class LaTeXService:
             List of ResumeSection objects
         """
         sections = []
-        # Find section commands
-        pattern = r'\\section\*?\{([^}]+)\}(.*?)(?=\\section|\Z)'
-        matches = re.findall(pattern, latex_code, re.DOTALL)
-        
-        for i, (name, content) in enumerate(matches):
+        # Find section commands; each section's content runs to the next
+        # \section, found with str.find rather than a lookahead at every character
+        for i, match in enumerate(_SECTION_RE.finditer(latex_code)):
+            end = latex_code.find('\\section', match.end())
+            content = latex_code[match.end():end if end != -1 else len(latex_code)]
             sections.append(ResumeSection(
-                name=name.strip(),
+                name=match.group(1).strip(),
                 content=content.strip(),
                 order=i
             ))
@@ -1,11 +1,57 @@
 """
 PDF processing service for ResuMatch AI
 """
-import PyPDF2
-import io
-from typing import Optional, Tuple
+import fitz  # PyMuPDF
+import hashlib
+import logging
+import multiprocessing
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional, Tuple
+from src.config.settings import get_config
+from src.utils.pdf_pages import extract_page_range
+from src.utils.response_cache import ResponseCache
 from src.validators.file_validator import FileValidator
 
+logger = logging.getLogger(__name__)
+config = get_config()
+
+# Common PDF artifacts: single code points are dropped with one str.translate pass,
+# multi-character sequences with one regex pass
+_ARTIFACT_CHARS = str.maketrans('', '', '\x00\ufeff\ufffd')
+_ARTIFACT_PATTERN = re.compile('|'.join(map(re.escape, ['/ne+', '/\u2640nednd', '/gtb'])))
+# Whitespace around line breaks, including blank lines, collapses to one newline
+_LINE_BREAK_PATTERN = re.compile(r'\s*\n\s*')
+
+# Extracted resume texts keyed by a hash of the PDF bytes, so repeat uploads of
+# the same file skip parsing in any worker; hot entries stay in memory
+_text_cache = ResponseCache(
+    path=config.PDF_TEXT_CACHE_PATH,
+    filename='resumatch_pdf_text_cache.sqlite3',
+    ttl=config.PDF_TEXT_CACHE_TTL,
+    memory_size=config.PDF_TEXT_CACHE_SIZE,
+    memory_chars=config.PDF_TEXT_CACHE_MEMORY_CHARS
+)
+
+# Lazily created pool for long documents; MuPDF is not thread-safe, so pages are
+# split across processes that each open their own copy of the document
+_page_pool: Optional[ProcessPoolExecutor] = None
+_page_pool_lock = threading.Lock()
+
+
+def _get_page_pool() -> ProcessPoolExecutor:
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is None:
+            # spawn, not fork: forking a multi-threaded Gunicorn worker is unsafe
+            _page_pool = ProcessPoolExecutor(
+                max_workers=config.PDF_EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _page_pool
+
+
 class PDFProcessor:
     """Handles PDF text extraction and validation"""
     
@@ -13,48 +59,32 @@ class PDFProcessor:
     def extract_text_from_pdf(pdf_file) -> Tuple[bool, str]:
         """
         Extract text from uploaded PDF file
+        Accepts raw PDF bytes, a Werkzeug FileStorage or any seekable binary file object
         Returns: (success: bool, result: str) - result is either text or error message
         """
         try:
-            # Read file content
-            file_content = pdf_file.read()
-            pdf_file.seek(0)  # Reset file pointer
-            
-            # Create PDF reader
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-            
-            # Check if PDF is encrypted
-            if pdf_reader.is_encrypted:
-                return False, "Cannot process encrypted PDF files. Please upload an unencrypted version."
-            
-            # Extract text from all pages
-            text = ""
-            page_count = len(pdf_reader.pages)
-            
-            if page_count == 0:
-                return False, "PDF file appears to be empty or corrupted."
+            pdf_bytes = PDFProcessor._read_bytes(pdf_file)
+            cache_key = PDFProcessor._fingerprint(pdf_file, pdf_bytes)
+            cached_text = _text_cache.get_by_key(cache_key)
+            if cached_text is not None:
+                return True, cached_text
             
-            for page_num, page in enumerate(pdf_reader.pages):
-                try:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-                except Exception as e:
-                    print(f"Warning: Could not extract text from page {page_num + 1}: {str(e)}")
-                    continue
+            # Pages are extracted by MuPDF's native parser; encrypted, empty and
+            # corrupted documents surface as ValueError with a user-facing message
+            try:
+                text = "\n".join(page_text for _, page_text in PDFProcessor.iter_page_text(pdf_bytes))
+            except ValueError as e:
+                return False, str(e)
             
-            # Validate extracted text
-            if not text.strip():
-                return False, "Could not extract text from PDF. The file might be image-based or corrupted."
+            error = PDFProcessor.check_extracted_text(text)
+            if error:
+                return False, error
             
-            # Check if content appears to be a resume
-            if not FileValidator.is_resume_content(text):
-                return False, "This doesn't appear to be a resume. Please upload a valid resume document."
+            # Pages are cleaned and normalized as they are extracted; only
+            # successful extractions are cached
+            _text_cache.put_by_key(cache_key, text)
             
-            # Clean and normalize text
-            cleaned_text = PDFProcessor._clean_text(text)
-            
-            return True, cleaned_text
+            return True, text
             
         except Exception as e:
             error_msg = str(e)
@@ -63,22 +93,102 @@ class PDFProcessor:
             else:
                 return False, f"Error processing PDF: {error_msg}"
     
+    @staticmethod
+    def check_extracted_text(text: str) -> Optional[str]:
+        """
+        Check extracted text before it is returned to the client
+        Returns: a user-facing error message, or None if the text looks like a resume
+        """
+        if not text.strip():
+            return "Could not extract text from PDF. The file might be image-based or corrupted."
+        
+        # Check if content appears to be a resume
+        if not FileValidator.is_resume_content(text):
+            return "This doesn't appear to be a resume. Please upload a valid resume document."
+        
+        return None
+    
+    @staticmethod
+    def iter_page_text(pdf_file) -> Iterator[Tuple[int, str]]:
+        """
+        Yield (page_number, cleaned_text) for each non-empty page as it is extracted
+        Raises ValueError with a user-facing message if the PDF cannot be read
+        """
+        pdf_bytes = PDFProcessor._read_bytes(pdf_file)
+        try:
+            doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+        except fitz.FileDataError:
+            raise ValueError("Invalid or corrupted PDF file. Please upload a valid PDF resume.")
+        
+        try:
+            if doc.needs_pass:
+                raise ValueError("Cannot process encrypted PDF files. Please upload an unencrypted version.")
+            if doc.page_count == 0:
+                raise ValueError("PDF file appears to be empty or corrupted.")
+            
+            workers = config.PDF_EXTRACT_WORKERS
+            if workers > 1 and doc.page_count >= config.PDF_PARALLEL_MIN_PAGES:
+                yield from PDFProcessor._iter_pages_parallel(pdf_bytes, doc.page_count, workers)
+                return
+            
+            for page_num, page in enumerate(doc):
+                try:
+                    page_text = PDFProcessor._clean_text(page.get_text("text"))
+                except Exception as e:
+                    logger.warning(f"Could not extract text from page {page_num + 1}: {str(e)}")
+                    continue
+                if page_text:
+                    yield page_num + 1, page_text
+        finally:
+            doc.close()
+    
+    @staticmethod
+    def _read_bytes(pdf_file) -> bytes:
+        """Return the PDF content, reading a file object's underlying stream exactly once"""
+        if isinstance(pdf_file, (bytes, bytearray)):
+            return pdf_file
+        
+        # Full reads of an in-memory upload (BytesIO) hand back its buffer without
+        # copying; MuPDF then owns the only other reference until the document closes
+        stream = getattr(pdf_file, 'stream', pdf_file)
+        stream.seek(0)
+        return stream.read()
+    
+    @staticmethod
+    def _fingerprint(pdf_file, pdf_bytes: bytes) -> str:
+        """Cache key for a PDF: the digest taken while the upload was buffered, if any"""
+        # In-memory uploads are hashed as they are parsed (see FingerprintedBytesIO)
+        fingerprint = getattr(getattr(pdf_file, 'stream', pdf_file), 'fingerprint', None)
+        if fingerprint is not None:
+            return fingerprint()
+        return hashlib.blake2b(pdf_bytes, digest_size=16).hexdigest()
+    
+    @staticmethod
+    def _iter_pages_parallel(pdf_bytes: bytes, page_count: int, workers: int) -> Iterator[Tuple[int, str]]:
+        """Extract page ranges in the process pool, yielding pages in order"""
+        chunk = -(-page_count // workers)
+        ranges = [(start, min(start + chunk, page_count)) for start in range(0, page_count, chunk)]
+        futures = [_get_page_pool().submit(extract_page_range, pdf_bytes, start, stop)
+                   for start, stop in ranges]
+        
+        for (start, _), future in zip(ranges, futures):
+            for offset, raw_text in enumerate(future.result()):
+                page_text = PDFProcessor._clean_text(raw_text)
+                if page_text:
+                    yield start + offset + 1, page_text
+    
     @staticmethod
     def _clean_text(text: str) -> str:
         """Clean and normalize extracted text"""
         if not text:
             return ""
         
-        # Remove excessive whitespace and normalize line breaks
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
-        cleaned_text = '\n'.join(lines)
+        # Remove common PDF artifacts first, so lines made up only of artifacts
+        # are dropped by the whitespace normalization below
+        cleaned_text = _ARTIFACT_PATTERN.sub('', text.translate(_ARTIFACT_CHARS))
         
-        # Remove common PDF artifacts
-        artifacts = ['/ne+', '/♀nednd', '/gtb', '��', '\x00', '\ufeff']
-        for artifact in artifacts:
-            cleaned_text = cleaned_text.replace(artifact, '')
-        
-        return cleaned_text
+        # Remove excessive whitespace and normalize line breaks
+        return _LINE_BREAK_PATTERN.sub('\n', cleaned_text).strip()
     
     @staticmethod
     def get_text_stats(text: str) -> dict:
@@ -86,12 +196,14 @@ class PDFProcessor:
         if not text:
             return {"character_count": 0, "word_count": 0, "line_count": 0}
         
+        # Lowercase once for all keyword checks rather than once per keyword
+        text_lower = text.casefold()
         return {
             "character_count": len(text),
             "word_count": len(text.split()),
-            "line_count": len(text.split('\n')),
-            "has_contact_info": any(keyword in text.lower() for keyword in ['email', '@', 'phone', 'linkedin']),
-            "has_experience": any(keyword in text.lower() for keyword in ['experience', 'work', 'employment', 'job']),
-            "has_education": any(keyword in text.lower() for keyword in ['education', 'degree', 'university', 'college']),
-            "has_skills": any(keyword in text.lower() for keyword in ['skills', 'technical', 'programming', 'software'])
+            "line_count": text.count('\n') + 1,
+            "has_contact_info": any(keyword in text_lower for keyword in ['email', '@', 'phone', 'linkedin']),
+            "has_experience": any(keyword in text_lower for keyword in ['experience', 'work', 'employment', 'job']),
+            "has_education": any(keyword in text_lower for keyword in ['education', 'degree', 'university', 'college']),
+            "has_skills": any(keyword in text_lower for keyword in ['skills', 'technical', 'programming', 'software'])
         }
\ No newline at end of file
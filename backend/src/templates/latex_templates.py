@@ -2,11 +2,119 @@
 LaTeX Templates for Resume Generation
 Python 3.9 compatible version - uses string concatenation instead of f-strings with backslashes
 """
+import re
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from typing import Dict, List
 from src.services.latex_service import ResumeData
 
 
+# Static document frame shared by every resume a template generates; only the
+# name, contact line and sections in between are built per resume
+MODERN_PREAMBLE = r'''\documentclass[11pt,a4paper]{article}
+
+% Packages
+\usepackage[utf8]{inputenc}
+\usepackage[T1]{fontenc}
+\usepackage{lmodern}
+\usepackage[margin=0.75in]{geometry}
+\usepackage{enumitem}
+\usepackage{hyperref}
+\usepackage{xcolor}
+\usepackage{titlesec}
+
+% Colors
+\definecolor{primary}{RGB}{0, 79, 144}
+\definecolor{secondary}{RGB}{100, 100, 100}
+
+% Section formatting
+\titleformat{\section}{\large\bfseries\color{primary}}{}{0em}{}[\titlerule]
+\titlespacing{\section}{0pt}{10pt}{5pt}
+
+% Hyperlink setup
+\hypersetup{
+    colorlinks=true,
+    linkcolor=primary,
+    urlcolor=primary
+}
+
+% Remove paragraph indentation
+\setlength{\parindent}{0pt}
+
+\begin{document}
+
+% Header
+\begin{center}
+'''
+
+MINIMAL_PREAMBLE = r'''\documentclass[11pt,a4paper]{article}
+
+\usepackage[utf8]{inputenc}
+\usepackage[T1]{fontenc}
+\usepackage[margin=1in]{geometry}
+\usepackage{enumitem}
+\usepackage{hyperref}
+
+\setlength{\parindent}{0pt}
+\pagestyle{empty}
+
+\begin{document}
+
+'''
+
+ACADEMIC_PREAMBLE = r'''\documentclass[11pt,a4paper]{article}
+
+\usepackage[utf8]{inputenc}
+\usepackage[T1]{fontenc}
+\usepackage[margin=1in]{geometry}
+\usepackage{enumitem}
+\usepackage{hyperref}
+\usepackage{titlesec}
+
+\titleformat{\section}{\large\bfseries}{}{0em}{}[\hrule]
+\titlespacing{\section}{0pt}{12pt}{6pt}
+
+\setlength{\parindent}{0pt}
+\pagestyle{empty}
+
+\begin{document}
+
+\begin{center}
+'''
+
+DOCUMENT_END = r'''
+\end{document}
+'''
+
+
+# One pass over the text; sequential str.replace calls would also re-escape
+# the braces of the \textbackslash{} they had just inserted
+_ESCAPE_TABLE = str.maketrans({
+    '\\': '\\textbackslash{}',
+    '&': '\\&',
+    '%': '\\%',
+    '$': '\\$',
+    '#': '\\#',
+    '_': '\\_',
+    '{': '\\{',
+    '}': '\\}',
+    '~': '\\textasciitilde{}',
+    '^': '\\textasciicircum{}',
+})
+# Most fields (names, dates, skills) contain none of the characters above;
+# a regex search finds that faster than translate's per-character lookups
+_SPECIAL_RE = re.compile(r'[\\&%$#_{}~^]')
+
+
+@lru_cache(maxsize=1024)
+def _escape_latex(text: str) -> str:
+    # Module-level so the cache is shared by every template instance; skills
+    # and tech stacks repeat the same short tokens across sections and resumes
+    if not _SPECIAL_RE.search(text):
+        return text
+    return text.translate(_ESCAPE_TABLE)
+
+
 class BaseTemplate(ABC):
     """Base class for LaTeX resume templates"""
     
@@ -28,21 +136,7 @@ class BaseTemplate(ABC):
         """Escape special LaTeX characters"""
         if not text:
             return ""
-        replacements = [
-            ('\\', '\\textbackslash{}'),
-            ('&', '\\&'),
-            ('%', '\\%'),
-            ('$', '\\$'),
-            ('#', '\\#'),
-            ('_', '\\_'),
-            ('{', '\\{'),
-            ('}', '\\}'),
-            ('~', '\\textasciitilde{}'),
-            ('^', '\\textasciicircum{}'),
-        ]
-        for old, new in replacements:
-            text = text.replace(old, new)
-        return text
+        return _escape_latex(text)
 
 
 class ModernTemplate(BaseTemplate):
@@ -57,41 +151,6 @@ class ModernTemplate(BaseTemplate):
         return "A clean, modern resume template with a professional look"
     
     def generate(self, data: ResumeData) -> str:
-        header = r'''\documentclass[11pt,a4paper]{article}
-
-% Packages
-\usepackage[utf8]{inputenc}
-\usepackage[T1]{fontenc}
-\usepackage{lmodern}
-\usepackage[margin=0.75in]{geometry}
-\usepackage{enumitem}
-\usepackage{hyperref}
-\usepackage{xcolor}
-\usepackage{titlesec}
-
-% Colors
-\definecolor{primary}{RGB}{0, 79, 144}
-\definecolor{secondary}{RGB}{100, 100, 100}
-
-% Section formatting
-\titleformat{\section}{\large\bfseries\color{primary}}{}{0em}{}[\titlerule]
-\titlespacing{\section}{0pt}{10pt}{5pt}
-
-% Hyperlink setup
-\hypersetup{
-    colorlinks=true,
-    linkcolor=primary,
-    urlcolor=primary
-}
-
-% Remove paragraph indentation
-\setlength{\parindent}{0pt}
-
-\begin{document}
-
-% Header
-\begin{center}
-'''
         name_line = "    {\\LARGE\\bfseries " + self.escape_latex(data.name) + "}\\\\[5pt]\n"
         contact_line = "    " + self._generate_contact_line(data) + "\n"
         
@@ -105,10 +164,12 @@ class ModernTemplate(BaseTemplate):
         projects = self._generate_projects(data)
         certifications = self._generate_certifications(data)
         
-        footer = r'''
-\end{document}
-'''
-        return header + name_line + contact_line + middle + summary + experience + education + skills + projects + certifications + footer
+        # One join sizes the result once instead of copying it at every "+"
+        return ''.join((
+            MODERN_PREAMBLE, name_line, contact_line, middle,
+            summary, experience, education, skills, projects, certifications,
+            DOCUMENT_END
+        ))
     
     def _generate_contact_line(self, data: ResumeData) -> str:
         items = []
@@ -176,7 +237,7 @@ class ModernTemplate(BaseTemplate):
         if not data.skills:
             return ""
         
-        skills_text = ', '.join([self.escape_latex(s) for s in data.skills])
+        skills_text = ', '.join(map(self.escape_latex, data.skills))
         return "\\section*{Skills}\n" + skills_text + "\n\n"
     
     def _generate_projects(self, data: ResumeData) -> str:
@@ -188,7 +249,7 @@ class ModernTemplate(BaseTemplate):
             name = self.escape_latex(proj.get('name', ''))
             description = self.escape_latex(proj.get('description', ''))
             tech = proj.get('technologies', [])
-            tech_text = " \\textit{(" + ', '.join([self.escape_latex(t) for t in tech]) + ")}" if tech else ""
+            tech_text = " \\textit{(" + ', '.join(map(self.escape_latex, tech)) + ")}" if tech else ""
             
             item = "\\textbf{" + name + "}" + tech_text + ": " + description + "\\\\[3pt]\n"
             items.append(item)
@@ -215,20 +276,6 @@ class MinimalTemplate(BaseTemplate):
         return "A minimalist resume template with clean typography"
     
     def generate(self, data: ResumeData) -> str:
-        header = r'''\documentclass[11pt,a4paper]{article}
-
-\usepackage[utf8]{inputenc}
-\usepackage[T1]{fontenc}
-\usepackage[margin=1in]{geometry}
-\usepackage{enumitem}
-\usepackage{hyperref}
-
-\setlength{\parindent}{0pt}
-\pagestyle{empty}
-
-\begin{document}
-
-'''
         name_line = "{\\Large\\bfseries " + self.escape_latex(data.name) + "}\\\\[5pt]\n"
         contact_line = self.escape_latex(data.email) + " $\\cdot$ " + self.escape_latex(data.phone)
         if data.location:
@@ -237,10 +284,7 @@ class MinimalTemplate(BaseTemplate):
         
         body = self._generate_body(data)
         
-        footer = r'''
-\end{document}
-'''
-        return header + name_line + contact_line + body + footer
+        return ''.join((MINIMAL_PREAMBLE, name_line, contact_line, body, DOCUMENT_END))
     
     def _generate_body(self, data: ResumeData) -> str:
         sections = []
@@ -267,7 +311,7 @@ class MinimalTemplate(BaseTemplate):
             sections.append("\\textbf{Education}\\\\[3pt]\n" + '\\\\[3pt]\n'.join(edu_items) + '\\\\[10pt]')
         
         if data.skills:
-            skills_text = ', '.join([self.escape_latex(s) for s in data.skills])
+            skills_text = ', '.join(map(self.escape_latex, data.skills))
             sections.append("\\textbf{Skills}\\\\[3pt]\n" + skills_text)
         
         return '\n\n'.join(sections)
@@ -285,25 +329,6 @@ class AcademicTemplate(BaseTemplate):
         return "A comprehensive academic CV template suitable for research positions"
     
     def generate(self, data: ResumeData) -> str:
-        header = r'''\documentclass[11pt,a4paper]{article}
-
-\usepackage[utf8]{inputenc}
-\usepackage[T1]{fontenc}
-\usepackage[margin=1in]{geometry}
-\usepackage{enumitem}
-\usepackage{hyperref}
-\usepackage{titlesec}
-
-\titleformat{\section}{\large\bfseries}{}{0em}{}[\hrule]
-\titlespacing{\section}{0pt}{12pt}{6pt}
-
-\setlength{\parindent}{0pt}
-\pagestyle{empty}
-
-\begin{document}
-
-\begin{center}
-'''
         name_line = "{\\LARGE\\bfseries " + self.escape_latex(data.name) + "}\\\\[10pt]\n"
         contact = self.escape_latex(data.email) + " $|$ " + self.escape_latex(data.phone)
         if data.location:
@@ -312,10 +337,7 @@ class AcademicTemplate(BaseTemplate):
         
         sections = self._generate_sections(data)
         
-        footer = r'''
-\end{document}
-'''
-        return header + name_line + contact_line + sections + footer
+        return ''.join((ACADEMIC_PREAMBLE, name_line, contact_line, sections, DOCUMENT_END))
     
     def _generate_sections(self, data: ResumeData) -> str:
         sections = []
@@ -339,7 +361,7 @@ class AcademicTemplate(BaseTemplate):
             sections.append("\\section*{Research Experience}\n" + '\n'.join(items))
         
         if data.skills:
-            skills_text = ', '.join([self.escape_latex(s) for s in data.skills])
+            skills_text = ', '.join(map(self.escape_latex, data.skills))
             sections.append("\\section*{Technical Skills}\n" + skills_text)
         
         if data.projects:
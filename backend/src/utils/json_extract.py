@@ -0,0 +1,43 @@
+"""
+JSON extraction from model responses
+Finds JSON values embedded in free text in a single forward pass
+"""
+import re
+from typing import Dict, Iterator, Pattern
+
+# A whole string literal (so brackets inside it don't count) or a bracket
+_TOKENS: Dict[str, Pattern] = {
+    '{': re.compile(r'"(?:[^"\\]|\\.)*"|[{}]'),
+    '[': re.compile(r'"(?:[^"\\]|\\.)*"|[\[\]]'),
+}
+
+
+def iter_json_spans(text: str, opener: str = '{') -> Iterator[str]:
+    """
+    Yield each balanced top-level {...} (or [...]) span in text, in order
+    
+    Unlike a greedy r'\\{.*\\}' search, this never backtracks: the text is
+    scanned once, so malformed or truncated responses cost linear time.
+    
+    Args:
+        text: Model response that may wrap the JSON in prose or markdown
+        opener: '{' for objects or '[' for arrays
+    """
+    tokens = _TOKENS[opener]
+    start = text.find(opener)
+    while start != -1:
+        depth = 0
+        for match in tokens.finditer(text, start):
+            token = match.group()
+            if token == opener:
+                depth += 1
+            elif token[0] != '"':
+                depth -= 1
+                if depth == 0:
+                    end = match.end()
+                    yield text[start:end]
+                    break
+        else:
+            # Unbalanced to the end of the text (e.g. a truncated response)
+            return
+        start = text.find(opener, end)
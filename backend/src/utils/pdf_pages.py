@@ -0,0 +1,12 @@
+"""
+Page-level PDF text extraction for worker processes
+Kept free of app imports so spawned pool processes start with just PyMuPDF loaded
+"""
+from typing import List
+import fitz  # PyMuPDF
+
+
+def extract_page_range(pdf_bytes: bytes, start: int, stop: int) -> List[str]:
+    """Extract raw text for pages [start, stop) from an in-memory PDF"""
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        return [doc[i].get_text("text") for i in range(start, stop)]
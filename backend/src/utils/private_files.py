@@ -0,0 +1,46 @@
+"""
+Private on-disk storage for caches and job results
+Resume text and analyses must not be readable (or pre-creatable) by other local users
+"""
+import os
+import stat
+import tempfile
+
+
+def private_dir() -> str:
+    """
+    Return a per-user directory under the system temp dir, created with mode 0700
+
+    Raises:
+        OSError: the directory exists but is a symlink, belongs to another
+            user or is accessible to others
+    """
+    path = os.path.join(tempfile.gettempdir(), f'resumatch-{os.getuid()}')
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+
+    # A fixed name in a shared directory may have been created by someone else
+    info = os.lstat(path)
+    if (not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid()
+            or stat.S_IMODE(info.st_mode) & 0o077):
+        raise OSError(f"Refusing to use insecure cache directory {path}")
+    return path
+
+
+def default_path(filename: str) -> str:
+    """Return the default location of a store file inside the private directory"""
+    return os.path.join(private_dir(), filename)
+
+
+def create_private_file(path: str) -> None:
+    """
+    Create path with mode 0600 if it doesn't exist yet
+
+    SQLite creates its database, -wal and -shm files with the process umask
+    (0 under our Gunicorn config), and the journal files copy the database's
+    mode, so the database is created first with owner-only permissions.
+    """
+    fd = os.open(path, os.O_CREAT | os.O_RDWR | os.O_NOFOLLOW, 0o600)
+    os.close(fd)
@@ -0,0 +1,145 @@
+"""
+Persistent response cache for AI calls
+Stores raw model responses in SQLite so repeat submissions skip the Gemini round-trip
+"""
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from typing import Optional, Tuple
+from src.utils.private_files import create_private_file, default_path
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """SQLite-backed cache of model responses keyed by prompt hash, fronted by an in-process LRU"""
+
+    def __init__(self, path: str = "", ttl: int = 24 * 60 * 60, enabled: bool = True,
+                 memory_size: int = 256, memory_chars: int = 0,
+                 filename: str = 'resumatch_response_cache.sqlite3'):
+        """
+        Initialize the response cache
+
+        Args:
+            path: SQLite database file (defaults to filename in a private temp directory)
+            ttl: Seconds a cached response stays valid
+            enabled: Disable to turn every lookup into a miss
+            memory_size: Entries kept in memory in front of SQLite (0 to disable)
+            memory_chars: Total characters the in-memory entries may hold (0 for no limit)
+            filename: Database file name used when no path is given
+        """
+        self.path = path
+        self.filename = filename
+        self.ttl = ttl
+        self.enabled = enabled
+        self.memory_size = memory_size
+        self.memory_chars = memory_chars
+        self._memory_used = 0
+        # key -> (created_at, response), most recently used last
+        self._memory: "OrderedDict[str, Tuple[int, str]]" = OrderedDict()
+        self._memory_lock = threading.Lock()
+        if self.enabled:
+            self._init_db()
+
+    @staticmethod
+    def make_key(prompt: str, model_name: str) -> str:
+        """Build the cache key for a prompt sent to a given model"""
+        return hashlib.blake2b(f"{model_name}\x00{prompt}".encode('utf-8'), digest_size=16).hexdigest()
+
+    def get(self, prompt: str, model_name: str) -> Optional[str]:
+        """Return the cached response for a prompt, or None on miss"""
+        return self.get_by_key(self.make_key(prompt, model_name))
+
+    def get_by_key(self, key: str) -> Optional[str]:
+        """Return the cached response for a precomputed key (e.g. from make_key), or None on miss"""
+        if not self.enabled:
+            return None
+
+        cutoff = int(time.time()) - self.ttl
+
+        with self._memory_lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > cutoff:
+                    self._memory.move_to_end(key)
+                    return entry[1]
+                del self._memory[key]
+                self._memory_used -= len(entry[1])
+
+        try:
+            with closing(self._connect()) as conn:
+                row = conn.execute(
+                    "SELECT response, created_at FROM cache WHERE hash = ? AND created_at > ?",
+                    (key, cutoff)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache lookup failed: {e}")
+            return None
+
+        if not row:
+            return None
+        self._remember(key, row[1], row[0])
+        return row[0]
+
+    def put(self, prompt: str, model_name: str, response: str) -> None:
+        """Store a model response for a prompt"""
+        self.put_by_key(self.make_key(prompt, model_name), response)
+
+    def put_by_key(self, key: str, response: str) -> None:
+        """Store a response under a precomputed key"""
+        if not self.enabled or not response:
+            return
+
+        created_at = int(time.time())
+        self._remember(key, created_at, response)
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (hash, response, created_at) VALUES (?, ?, ?)",
+                    (key, response, created_at)
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache write failed: {e}")
+
+    def _remember(self, key: str, created_at: int, response: str) -> None:
+        if self.memory_size <= 0:
+            return
+        # An entry that alone exceeds the budget would flush everything else
+        if self.memory_chars and len(response) > self.memory_chars:
+            return
+        with self._memory_lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_used -= len(previous[1])
+            self._memory[key] = (created_at, response)
+            self._memory_used += len(response)
+            # Entries vary from short JSON to whole resumes, so bound the total
+            # size as well as the count
+            while len(self._memory) > self.memory_size or (
+                    self.memory_chars and self._memory_used > self.memory_chars):
+                _, (_, evicted) = self._memory.popitem(last=False)
+                self._memory_used -= len(evicted)
+
+    def _connect(self) -> sqlite3.Connection:
+        # A short-lived connection per call keeps the cache safe across
+        # Gunicorn worker forks and request threads
+        return sqlite3.connect(self.path, timeout=5)
+
+    def _init_db(self) -> None:
+        try:
+            if not self.path:
+                self.path = default_path(self.filename)
+            create_private_file(self.path)
+            with closing(self._connect()) as conn, conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS cache ("
+                    "hash TEXT PRIMARY KEY, response TEXT NOT NULL, created_at INTEGER NOT NULL)"
+                )
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Response cache unavailable, caching disabled: {e}")
+            self.enabled = False
@@ -0,0 +1,54 @@
+"""
+Cached JSON responses for static API data
+Payloads that never change while the process runs are serialized (and
+compressed) once and revalidated by ETag
+"""
+import gzip
+import hashlib
+from typing import Callable, Dict, Optional, Tuple
+from flask import Response, current_app, request
+
+# Bodies smaller than this gain little or nothing from gzip
+GZIP_MIN_SIZE = 1024
+
+# key -> (serialized body, gzipped body or None, ETag)
+_bodies: Dict[str, Tuple[bytes, Optional[bytes], str]] = {}
+
+
+def static_json(key: str, build: Callable[[], dict]) -> Response:
+    """
+    Return a JSON response for input-independent data
+    
+    The payload is built, serialized and gzipped on first use only. Each request
+    still gets its own Response object, since after-request hooks (CORS) set
+    headers on it; clients that accept gzip get the precompressed body, and a
+    matching If-None-Match is answered with 304 Not Modified.
+    
+    Args:
+        key: Identifies the payload (e.g. route name plus path parameters)
+        build: Produces the payload the first time the key is requested
+    """
+    entry = _bodies.get(key)
+    if entry is None:
+        body = current_app.json.dumps(build()).encode('utf-8')
+        gzipped = gzip.compress(body, compresslevel=9) if len(body) >= GZIP_MIN_SIZE else None
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        # Concurrent first requests may both build; the first stored entry wins
+        entry = _bodies.setdefault(key, (body, gzipped, etag))
+    
+    body, gzipped, etag = entry
+    if gzipped is None:
+        response = Response(body, mimetype='application/json')
+        response.set_etag(etag)
+        return response.make_conditional(request)
+    
+    # Each encoding is a distinct representation, so it needs its own ETag
+    if request.accept_encodings['gzip']:
+        response = Response(gzipped, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+        response.set_etag(f"{etag}-gzip")
+    else:
+        response = Response(body, mimetype='application/json')
+        response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    return response.make_conditional(request)
@@ -1,30 +1,37 @@
 """
 File validation utilities for ResuMatch AI
 """
+import logging
 import os
+import re
 from werkzeug.utils import secure_filename
 from flask import jsonify
 
+logger = logging.getLogger(__name__)
+
 # Try to import magic, with fallback if not available
 try:
     import magic
     MAGIC_AVAILABLE = True
 except ImportError:
     MAGIC_AVAILABLE = False
-    print("Warning: python-magic not available. File type validation will be basic.")
+    logger.warning("python-magic not available. File type validation will be basic.")
 
 class FileValidator:
     """Handles file validation for uploads"""
     
-    ALLOWED_EXTENSIONS = {'pdf'}
-    ALLOWED_MIME_TYPES = {
+    ALLOWED_EXTENSIONS = frozenset({'pdf'})
+    ALLOWED_MIME_TYPES = frozenset({
         'application/pdf',
         'application/x-pdf',
         'application/acrobat',
         'applications/vnd.pdf',
         'text/pdf',
         'text/x-pdf'
-    }
+    })
+    
+    # Bytes sniffed for type detection; libmagic only inspects the file head
+    HEADER_SNIFF_BYTES = 2048
     
     # Resume-related keywords that should be present
     RESUME_KEYWORDS = [
@@ -33,28 +40,37 @@ class FileValidator:
         'project', 'achievement', 'responsibility', 'job', 'career',
         'professional', 'technical', 'qualification', 'certificate'
     ]
+    # All keywords in one case-insensitive pattern so the text is scanned once
+    RESUME_KEYWORD_PATTERN = re.compile('|'.join(map(re.escape, RESUME_KEYWORDS)), re.IGNORECASE)
+    # Resume keywords cluster on the first page; only the opening ~2 pages are scanned
+    RESUME_SCAN_LIMIT = 8192
     
     @staticmethod
     def allowed_file(filename):
         """Check if file extension is allowed"""
         if not filename:
             return False
-        return '.' in filename and \
-               filename.rsplit('.', 1)[1].lower() in FileValidator.ALLOWED_EXTENSIONS
+        # splitext yields '' for names without an extension and for dotfiles like '.pdf'
+        ext = os.path.splitext(filename)[1][1:].lower()
+        return ext in FileValidator.ALLOWED_EXTENSIONS
     
     @staticmethod
     def validate_file_type(file_content):
         """Validate file type using python-magic or fallback method"""
+        # Well-formed PDFs start with the header, which is all libmagic would
+        # conclude from them too; skip its full rule scan for the common case
+        if file_content.startswith(b'%PDF-'):
+            return True
         if not MAGIC_AVAILABLE:
-            # Basic validation - check PDF header
-            return file_content.startswith(b'%PDF-')
+            return False
         
+        # Let libmagic judge files with junk before the header, which readers tolerate
         try:
             mime_type = magic.from_buffer(file_content, mime=True)
             return mime_type in FileValidator.ALLOWED_MIME_TYPES
         except Exception:
-            # Fallback to basic validation if python-magic fails
-            return file_content.startswith(b'%PDF-')
+            # The header check above already failed
+            return False
     
     @staticmethod
     def validate_file_size(file_size, max_size=16*1024*1024):
@@ -64,15 +80,21 @@ class FileValidator:
     @staticmethod
     def is_resume_content(text_content):
         """Check if the extracted text appears to be a resume"""
-        if not text_content or len(text_content.strip()) < 100:
+        if not text_content or len(text_content) < 100:
+            return False
+        # Only copy the text via strip() when surrounding whitespace could matter;
+        # extracted text is already stripped, so this is normally skipped
+        if (text_content[0].isspace() or text_content[-1].isspace()) and len(text_content.strip()) < 100:
             return False
         
-        text_lower = text_content.lower()
-        keyword_count = sum(1 for keyword in FileValidator.RESUME_KEYWORDS 
-                          if keyword in text_lower)
-        
-        # Should have at least 3 resume-related keywords
-        return keyword_count >= 3
+        # Should have at least 3 distinct resume-related keywords; stop at the third
+        found = set()
+        pattern = FileValidator.RESUME_KEYWORD_PATTERN
+        for match in pattern.finditer(text_content, 0, FileValidator.RESUME_SCAN_LIMIT):
+            found.add(match.group(0).lower())
+            if len(found) >= 3:
+                return True
+        return False
     
     @staticmethod
     def validate_upload(file):
@@ -92,17 +114,21 @@ class FileValidator:
             errors.append("Please upload a PDF file only")
             return False, errors
         
-        # Read file content for validation
-        file_content = file.read()
-        file.seek(0)  # Reset file pointer
+        # Measure the size by seeking to the end; no bytes are read
+        stream = getattr(file, 'stream', file)
+        stream.seek(0, os.SEEK_END)
+        file_size = stream.tell()
+        stream.seek(0)  # Reset file pointer
         
         # Check file size
-        if not FileValidator.validate_file_size(len(file_content)):
+        if not FileValidator.validate_file_size(file_size):
             errors.append("File size exceeds 16MB limit")
             return False, errors
         
-        # Check MIME type
-        if not FileValidator.validate_file_type(file_content):
+        # Check MIME type from the file header only
+        header = stream.read(FileValidator.HEADER_SNIFF_BYTES)
+        stream.seek(0)  # Reset file pointer
+        if not FileValidator.validate_file_type(header):
             errors.append("Invalid PDF file format")
             return False, errors
         
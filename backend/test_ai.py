@@ -1,14 +1,8 @@
 #!/usr/bin/env python3
+import os
 import sys
-sys.path.insert(0, '/Users/dhanyabad/code2/ResuMatch-Ai/backend')
 
-from src.services.ai_service import AIAnalyzer
-
-# Test the AI service
-analyzer = AIAnalyzer()
-print("AI Analyzer initialized successfully")
-
-test_resume = """
+TEST_RESUME = """
 John Doe
 Software Engineer
 
@@ -17,7 +11,22 @@ EXPERIENCE:
 - Built web applications using Flask
 """
 
-print("Testing analysis...")
-result = analyzer.analyze_resume(test_resume, "")
-print(f"Result type: {type(result)}")
-print(f"Result: {result}")
+
+def main():
+    # Imported here so collecting this file (pytest, coverage, IDEs) doesn't
+    # load the AI service
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from src.services.ai_service import AIAnalyzer
+
+    # Test the AI service
+    analyzer = AIAnalyzer()
+    print("AI Analyzer initialized successfully")
+
+    print("Testing analysis...")
+    result = analyzer.analyze_resume(TEST_RESUME, "")
+    print(f"Result type: {type(result)}")
+    print(f"Result: {result}")
+
+
+if __name__ == "__main__":
+    main()
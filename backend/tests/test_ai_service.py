@@ -0,0 +1,60 @@
+"""
+Tests for resume trimming in the AI service
+Run from backend/: python -m unittest discover tests
+"""
+import unittest
+
+from src.services.ai_service import trim_resume
+
+
+HEADER = "Jane Doe\nSoftware Engineer\njane@example.com | (555) 123-4567\n"
+SUMMARY = "Summary\nBackend engineer focused on distributed systems.\n"
+SKILLS = "Skills\nPython, Go, Kubernetes, PostgreSQL, Redis\n"
+EDUCATION = "Education\nB.S. Computer Science, State University, 2016\n"
+EXPERIENCE = "Experience\n" + "".join(
+    "- Experience with Kubernetes rollouts at Acme, item %d, cutting deploy time by 40%%\n" % i
+    for i in range(80)
+)
+
+
+class TrimResumeTests(unittest.TestCase):
+
+    def test_short_text_is_unchanged(self):
+        text = HEADER + SKILLS
+        self.assertEqual(trim_resume(text, 1000), text)
+
+    def test_long_resume_keeps_every_section(self):
+        text = HEADER + SUMMARY + EXPERIENCE + SKILLS + EDUCATION
+        max_chars = 4000
+        self.assertGreater(len(text), max_chars)
+
+        trimmed = trim_resume(text, max_chars)
+
+        self.assertLessEqual(len(trimmed), max_chars)
+        self.assertGreater(len(trimmed), max_chars - 100)
+        # Short sections are kept whole; the long one takes the rest of the budget
+        for section in (HEADER, SUMMARY, SKILLS, EDUCATION):
+            self.assertIn(section.strip(), trimmed)
+        self.assertIn("Experience\n- Experience with Kubernetes", trimmed)
+
+    def test_slightly_over_budget_keeps_most_of_long_section(self):
+        text = HEADER + EXPERIENCE + SKILLS + EDUCATION
+        max_chars = len(text) - 50
+
+        trimmed = trim_resume(text, max_chars)
+
+        self.assertLessEqual(len(trimmed), max_chars)
+        self.assertGreater(len(trimmed), max_chars - 100)
+        self.assertIn(EDUCATION.strip(), trimmed)
+
+    def test_body_lines_starting_with_heading_words_are_not_headings(self):
+        text = HEADER + "Experience\n" + "Skills include Python and Go.\n" * 60
+        trimmed = trim_resume(text, 500)
+
+        self.assertLessEqual(len(trimmed), 500)
+        self.assertTrue(trimmed.startswith(HEADER.strip()))
+        self.assertIn("Experience\nSkills include Python", trimmed)
+
+
+if __name__ == '__main__':
+    unittest.main()
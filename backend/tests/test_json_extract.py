@@ -0,0 +1,31 @@
+"""
+Tests for extracting JSON embedded in model responses
+Run from backend/: python -m unittest discover tests
+"""
+import unittest
+
+from src.utils.json_extract import iter_json_spans
+
+
+class IterJsonSpansTests(unittest.TestCase):
+
+    def test_brackets_inside_strings_are_ignored(self):
+        self.assertEqual(list(iter_json_spans('{"a": "}{"} x')), ['{"a": "}{"}'])
+
+    def test_escaped_quotes_inside_strings(self):
+        self.assertEqual(list(iter_json_spans('{"a": "say \\"}\\""}')), ['{"a": "say \\"}\\""}'])
+
+    def test_object_wrapped_in_prose_and_markdown(self):
+        text = 'Here you go:\n```json\n{"score": {"ats": 80}}\n```\nThanks {"b": 1}'
+        self.assertEqual(list(iter_json_spans(text)), ['{"score": {"ats": 80}}', '{"b": 1}'])
+
+    def test_truncated_input_yields_only_complete_spans(self):
+        self.assertEqual(list(iter_json_spans('{"a": 1} {"b": [1, 2')), ['{"a": 1}'])
+        self.assertEqual(list(iter_json_spans('{"a": "unterminated')), [])
+
+    def test_arrays(self):
+        self.assertEqual(list(iter_json_spans('Skills: ["C#", "]"] done', '[')), ['["C#", "]"]'])
+
+
+if __name__ == '__main__':
+    unittest.main()
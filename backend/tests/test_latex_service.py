@@ -0,0 +1,38 @@
+"""
+Tests for LaTeX source validation
+Run from backend/: python -m unittest discover tests
+"""
+import unittest
+
+from src.services.latex_service import LaTeXService
+
+
+def document(body: str) -> str:
+    return '\\documentclass{article}\n\\begin{document}\n' + body + '\n\\end{document}\n'
+
+
+class ValidateLatexTests(unittest.TestCase):
+
+    def setUp(self):
+        self.service = LaTeXService()
+
+    def test_valid_document(self):
+        is_valid, errors = self.service.validate_latex(
+            document('\\begin{itemize}\n\\item One\n\\end{itemize}'))
+        self.assertTrue(is_valid)
+        self.assertEqual(errors, [])
+
+    def test_stray_end_is_reported(self):
+        is_valid, errors = self.service.validate_latex(document('Text\n\\end{itemize}'))
+        self.assertFalse(is_valid)
+        self.assertEqual(errors, ['Unbalanced environment: itemize'])
+
+    def test_unclosed_begin_is_reported_once(self):
+        is_valid, errors = self.service.validate_latex(
+            document('\\begin{itemize}\n\\begin{itemize}\n\\end{itemize}'))
+        self.assertFalse(is_valid)
+        self.assertEqual(errors, ['Unbalanced environment: itemize'])
+
+
+if __name__ == '__main__':
+    unittest.main()
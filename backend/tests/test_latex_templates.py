@@ -0,0 +1,32 @@
+"""
+Tests for LaTeX escaping in resume templates
+Run from backend/: python -m unittest discover tests
+"""
+import unittest
+
+from src.templates.latex_templates import get_template
+
+
+class EscapeLatexTests(unittest.TestCase):
+
+    def setUp(self):
+        self.template = get_template('modern')
+
+    def test_backslash_is_not_escaped_twice(self):
+        # The braces of the inserted \textbackslash{} must stay unescaped
+        self.assertEqual(self.template.escape_latex('a\\b_c'), 'a\\textbackslash{}b\\_c')
+
+    def test_all_special_characters(self):
+        self.assertEqual(
+            self.template.escape_latex('&%$#_{}~^'),
+            '\\&\\%\\$\\#\\_\\{\\}\\textasciitilde{}\\textasciicircum{}'
+        )
+
+    def test_clean_and_empty_text(self):
+        self.assertEqual(self.template.escape_latex('Python 3, C++'), 'Python 3, C++')
+        self.assertEqual(self.template.escape_latex(''), '')
+        self.assertEqual(self.template.escape_latex(None), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
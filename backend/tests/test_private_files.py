@@ -0,0 +1,51 @@
+"""
+Tests for private cache and job store locations
+Run from backend/: python -m unittest discover tests
+"""
+import os
+import stat
+import tempfile
+import unittest
+from unittest import mock
+
+from src.utils.private_files import create_private_file, default_path, private_dir
+
+
+class PrivateFilesTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        patcher = mock.patch('tempfile.gettempdir', return_value=self.tmp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_directory_is_owner_only(self):
+        path = private_dir()
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o700)
+
+    def test_file_is_owner_only_despite_umask(self):
+        old_umask = os.umask(0)
+        try:
+            path = default_path('cache.sqlite3')
+            create_private_file(path)
+        finally:
+            os.umask(old_umask)
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+
+    def test_rejects_directory_others_can_access(self):
+        path = private_dir()
+        os.chmod(path, 0o755)
+        with self.assertRaises(OSError):
+            private_dir()
+
+    def test_rejects_symlinked_directory(self):
+        target = os.path.join(self.tmp.name, 'elsewhere')
+        os.mkdir(target, 0o700)
+        os.symlink(target, os.path.join(self.tmp.name, f'resumatch-{os.getuid()}'))
+        with self.assertRaises(OSError):
+            private_dir()
+
+
+if __name__ == '__main__':
+    unittest.main()
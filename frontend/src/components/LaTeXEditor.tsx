@@ -15,7 +15,7 @@ interface ValidationResult {
 }
 
 interface AIImproveResult {
-    overall_score?: number;
+    overall_score?: number | null;
     summary?: string;
     suggestions?: Array<{
         section: string;
@@ -24,6 +24,7 @@ interface AIImproveResult {
         priority: string;
     }>;
     improved_sections?: Record<string, string>;
+    failed_parts?: string[];
     error?: string;
 }
 
@@ -683,7 +684,7 @@ export default function LaTeXEditor({ initialCode, onCodeChange }: LaTeXEditorPr
                         ) : (
                             <div className="space-y-5">
                                 {/* Overall Score */}
-                                {aiResult.overall_score !== undefined && (
+                                {aiResult.overall_score != null && (
                                     <div className="bg-white/5 backdrop-blur-sm rounded-xl p-5 border border-white/10">
                                         <div className="flex items-center justify-between mb-3">
                                             <h3 className="font-semibold text-lg">Overall Score</h3>